@@ -3,7 +3,10 @@ from __future__ import annotations
 
 import os
 import json
+
+import click
 from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.exceptions import HTTPException
 from werkzeug.middleware.proxy_fix import ProxyFix
 from flask_cors import CORS
@@ -22,7 +25,7 @@ from models.ticket_sale import TicketSale
 from models.wallet import WalletAccount, WalletLedger, TopUp
 
 # Blueprints
-from routes.auth import auth_bp
+from routes.auth import auth_bp, require_role
 from routes.commuter import commuter_bp
 from routes.pao import pao_bp
 from routes.manager import manager_bp
@@ -31,6 +34,7 @@ from routes.tickets_static import tickets_bp
 
 # Background tasks / CLI
 from tasks.snap_trips import snap_finished_trips
+from tasks.rollup_ticket_sales import rollup_ticket_sales
 
 # MQTT ingest (we’ll patch some bits for ID compatibility and table name)
 try:
@@ -41,6 +45,42 @@ except Exception:
     _start_mqtt_ingest = None
 
 
+# Optional fast JSON encoder for every jsonify()/get_json() (falls back to stdlib json)
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    orjson-backed provider that keeps Flask's output format: sorted keys, non-str
+    keys allowed, and datetime/Decimal/etc. routed through DefaultJSONProvider.default
+    (HTTP dates, str(Decimal)) so existing payloads don't change.
+    """
+
+    def _dumpb(self, obj, sort_keys: bool, indent: bool) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._dumpb(obj, kwargs.get("sort_keys", self.sort_keys), bool(kwargs.get("indent"))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # jsonify(): hand orjson's bytes straight to the response (no str decode/re-encode)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._dumpb(obj, self.sort_keys, indent) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
 # ───────────────────────────────────────────────────────────────
 # GLOBAL DB TZ ENFORCEMENT (applies to all SQLAlchemy engines)
 # ───────────────────────────────────────────────────────────────
@@ -67,6 +107,8 @@ def _on_checkout(dbapi_conn, *_):
 
 def create_app() -> Flask:
     app = Flask(__name__)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
 
     # Respect reverse proxy headers (scheme / host) for correct URL generation
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)  # type: ignore[arg-type]
@@ -78,11 +120,14 @@ def create_app() -> Flask:
     # Load config + init extensions
     app.config.from_object(Config)
 
-    # Extra safety: ask driver to run the same TZ command at connect time
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "connect_args": {"init_command": "SET time_zone = '+08:00'"},
-        "pool_pre_ping": True,
+    # Extra safety: ask driver to run the same TZ command at connect time.
+    # Merged into Config's pool settings (replacing the dict would silently drop them).
+    engine_opts = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    engine_opts["connect_args"] = {
+        **engine_opts.get("connect_args", {}),
+        "init_command": "SET time_zone = '+08:00'",
     }
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_opts
 
     db.init_app(app)
     migrate.init_app(app, db)
@@ -100,6 +145,14 @@ def create_app() -> Flask:
         except Exception:
             app.logger.exception("[app] Failed to check @@session.time_zone")
 
+        # Warm the column-list cache the ticket/wallet handlers probe (read-only; the
+        # manager indexes are DDL and live in `flask manager-schema`)
+        try:
+            from routes.manager import preload_schema_cache
+            preload_schema_cache()
+        except Exception:
+            app.logger.exception("[app] Failed to preload schema cache")
+
         # ───────────────────────────────────────────────────────────────
         # MQTT INGEST START + PATCHES (so "2" works the same as "bus-02")
         # ───────────────────────────────────────────────────────────────
@@ -264,6 +317,19 @@ def create_app() -> Flask:
             started_at=int(time.time())
         )
 
+    @app.route("/health/pool")
+    @require_role("admin")
+    def health_pool():
+        # Per-worker connection pool usage (each gunicorn worker has its own pool); admins only,
+        # since it exposes the worker pid and pool state
+        pool = db.engine.pool
+        stats = {
+            name: getattr(pool, name)()
+            for name in ("size", "checkedin", "checkedout", "overflow")
+            if callable(getattr(pool, name, None))
+        }
+        return jsonify(pid=os.getpid(), status=pool.status(), **stats)
+
     # Register blueprints
     app.register_blueprint(auth_bp)
     app.register_blueprint(commuter_bp, url_prefix="/commuter")
@@ -278,6 +344,31 @@ def create_app() -> Flask:
         snap_finished_trips()
         print("Trip snapshots complete.")
 
+    # CLI: manager indexes / schema tweaks (DDL) — run once per deploy, before the workers
+    #   start, instead of every worker racing on it at boot
+    @app.cli.command("manager-schema")
+    def manager_schema_cmd():
+        from routes.manager import ensure_manager_indexes
+        ensure_manager_indexes()
+        print("Manager schema up to date.")
+
+    # CLI: nightly ticket_sale_daily rollup used by /manager/metrics/tickets
+    #   flask rollup-tickets                      → last 7 complete days (+ invalidated days)
+    #   flask rollup-tickets --since 2024-01-01   → backfill from a date
+    #   flask rollup-tickets --all                → backfill from the first ticket
+    @app.cli.command("rollup-tickets")
+    @click.option("--days-back", default=7, show_default=True, help="Complete days to rebuild.")
+    @click.option("--since", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+                  help="Backfill from this date (YYYY-MM-DD).")
+    @click.option("--all", "from_first", is_flag=True, help="Backfill from the first ticket sale.")
+    def rollup_tickets_cmd(days_back, since, from_first):
+        since = since.date() if since else None
+        if from_first:
+            first = db.session.query(func.min(TicketSale.created_at)).scalar()
+            since = first.date() if first else None
+        n = rollup_ticket_sales(days_back=days_back, since=since)
+        print(f"Ticket rollup complete ({n} day/bus rows).")
+
     return app
 
 
@@ -2,8 +2,9 @@
 from __future__ import annotations
 
 import os
+import time
 import jwt
-from functools import wraps
+from functools import lru_cache, wraps
 from datetime import datetime, timezone, timedelta
 
 from flask import request, jsonify, g, current_app
@@ -30,6 +31,20 @@ def _assigned_bus(uid: int) -> int | None:
     return int(bus_id) if bus_id is not None else None
 
 
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> tuple[int | None, float | None]:
+    """
+    Verify the JWT signature once per distinct token and remember (user_id, exp).
+    Expiry is checked by the caller on every request, so cached entries never
+    outlive the token. Invalid tokens raise and are therefore not cached.
+    """
+    payload = jwt.decode(
+        token, SECRET_KEY, algorithms=["HS256"], options={"verify_exp": False}
+    )
+    exp = payload.get("exp")
+    return payload.get("user_id"), (float(exp) if exp is not None else None)
+
+
 def require_role(*roles):
     """
     Usage:
@@ -51,9 +66,14 @@ def require_role(*roles):
 
             token = auth.split(" ", 1)[1]
             try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-                uid = payload.get("user_id")
-                user = db.session.get(User, uid)
+                uid, exp = _decode_token(token)
+                if exp is not None and exp <= time.time():
+                    raise jwt.ExpiredSignatureError("Signature has expired")
+
+                # Stacked guards in the same request share the first lookup
+                user = getattr(g, "user", None)
+                if user is None or user.id != uid:
+                    user = db.session.get(User, uid)
                 if not user:
                     return jsonify(error="User not found"), 401
 
@@ -14,11 +14,14 @@ class Config:
 
     # Engine options to prevent stale connection errors
     SQLALCHEMY_ENGINE_OPTIONS = {
-        "pool_pre_ping": True,      # Check connections before using them
+        # Pre-ping costs a SELECT 1 per checkout; DB_POOL_PRE_PING=0 skips it (recycling
+        # below and the sensor ingest retry-on-disconnect cover most stale connections)
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",
         "pool_recycle": 180,        # Recycle before MySQL’s wait_timeout
-        "pool_size": 5,             # Base pool size
-        "max_overflow": 10,         # Extra conns allowed above pool_size
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", "10")),       # Base pool size (per worker)
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", "15")), # Extra conns allowed above pool_size
         "pool_timeout": 30,         # Wait max 30s for a conn
+        "pool_use_lifo": True,      # Reuse the most recent conn; idle extras age out via recycle
         "connect_args": {
             "connect_timeout": 10,  # Fail fast on network issues
             "read_timeout": 10,
@@ -26,6 +29,16 @@ class Config:
         },
     }
 
+    # Reject oversized request bodies before they are parsed/spooled
+    MAX_CONTENT_LENGTH = int(os.environ.get("MAX_CONTENT_LENGTH", 16 * 1024 * 1024))
+
+    # Hand QR template file transfers to the front proxy (see manager.serve_qr_file)
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "0") == "1"
+    QR_ACCEL_REDIRECT_PREFIX = os.environ.get("QR_ACCEL_REDIRECT_PREFIX")
+
+    # Top-up void reason log (utils/reason_log); defaults to the app's instance folder
+    REASON_LOG_DIR = os.environ.get("REASON_LOG_DIR")
+
     WALLET_QR_SECRET = os.environ.get("WALLET_QR_SECRET", "dev-wallet-secret-change-me")
 
 
@@ -5,7 +5,8 @@ class Bus(db.Model):
     __tablename__ = "buses"
 
     id          = db.Column(db.Integer, primary_key=True)
-    identifier  = db.Column(db.String(64), nullable=False, unique=True)
+    # Case-insensitive so sensor deviceIds match without LOWER() (see routes/manager.py)
+    identifier  = db.Column(db.String(64, collation="utf8mb4_0900_ai_ci"), nullable=False, unique=True)
     capacity    = db.Column(db.Integer, nullable=True)
     description = db.Column(db.String(128), nullable=True)
 
@@ -5,6 +5,10 @@ from db import db
 class Trip(db.Model):
     __tablename__ = 'trips'
 
+    __table_args__ = (
+        db.Index("ix_trip_bus_date_start", "bus_id", "service_date", "start_time"),
+    )
+
     id           = db.Column(db.Integer,   primary_key=True)
     service_date = db.Column(db.Date,      nullable=False, index=True)
     bus_id       = db.Column(db.Integer,   db.ForeignKey('buses.id'), nullable=True)
@@ -34,6 +38,11 @@ class Trip(db.Model):
 class StopTime(db.Model):
     __tablename__ = 'stop_times'
 
+    __table_args__ = (
+        # a trip's stops in order: first/last-stop lookups, timetables
+        db.Index("ix_stoptime_trip_seq", "trip_id", "seq", "id"),
+    )
+
     id           = db.Column(db.Integer, primary_key=True)
     trip_id      = db.Column(db.Integer, db.ForeignKey('trips.id'), nullable=False)
     seq          = db.Column(db.Integer, nullable=False)
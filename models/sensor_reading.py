@@ -14,3 +14,16 @@ class SensorReading(db.Model):
     # ← ADD THIS:
     bus_id       = db.Column(db.Integer, db.ForeignKey('buses.id'), nullable=False)
     bus          = db.relationship('Bus', back_populates='sensor_readings')
+
+# readings per bus by (time, id), covering the counters: latest-reading lookups, the
+# (timestamp, id) keyset listing (InnoDB scans it backwards for DESC, no filesort on ties)
+# and the route-insights per-minute aggregate are index-only
+db.Index(
+    "ix_sensorreading_bus_ts_id_counts",
+    SensorReading.bus_id,
+    SensorReading.timestamp,
+    SensorReading.id,
+    SensorReading.total_count,
+    SensorReading.in_count,
+    SensorReading.out_count,
+)
@@ -50,3 +50,15 @@ class TicketSale(db.Model):
     origin_stop_time      = db.relationship('TicketStop', foreign_keys=[origin_stop_time_id])
     destination_stop_time = db.relationship('TicketStop', foreign_keys=[destination_stop_time_id])
     batch_id = db.Column(db.Integer, index=True, nullable=True)
+
+    __table_args__ = (
+        # covers the daily analytics range scan (filter + SUM(price) from the index)
+        db.Index("ix_ticketsale_created_bus_price", "created_at", "bus_id", "price"),
+        # per-commuter COUNT/MAX(created_at) lookups in the manager commuter list
+        db.Index("ix_ticketsale_user_created", "user_id", "created_at"),
+        # commuter_detail: COUNT/MAX(created_at)/SUM(price) of a commuter's non-voided tickets
+        db.Index("ix_ticketsale_user_void_created", "user_id", "voided", "created_at", "price"),
+        # per-bus day windows (tickets_for_day?bus_id=, revenue_breakdown); price makes the
+        # per-bus SUM(price) index-only
+        db.Index("ix_ticketsale_bus_created_price", "bus_id", "created_at", "price"),
+    )
@@ -0,0 +1,22 @@
+# models/ticket_sale_daily.py
+from db import db
+
+class TicketSaleDaily(db.Model):
+    """Per-day, per-bus rollup of non-voided ticket_sales (filled by tasks/rollup_ticket_sales.py)."""
+    __tablename__ = "ticket_sale_daily"
+
+    day     = db.Column(db.Date,    primary_key=True)
+    bus_id  = db.Column(db.Integer, primary_key=True)
+    tickets = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+
+
+class TicketSaleDailyDay(db.Model):
+    """
+    Days whose ticket_sale_daily rows are complete. A day without sales has no rollup
+    rows, so coverage is recorded here; readers aggregate every other day live.
+    """
+    __tablename__ = "ticket_sale_daily_days"
+
+    day       = db.Column(db.Date, primary_key=True)
+    rolled_at = db.Column(db.DateTime, nullable=False)
@@ -15,7 +15,7 @@ class User(db.Model):
     phone_number     = db.Column(db.String(32), nullable=True, unique=True)
     first_name       = db.Column(db.String(80), nullable=True)
     last_name        = db.Column(db.String(80), nullable=True)
-    role             = db.Column(db.String(32), nullable=False, default="commuter", index=True)
+    role             = db.Column(db.String(32), nullable=False, default="commuter")  # indexed via ix_users_role_name
 
     passenger_type = db.Column(db.String(20), nullable=False)       
     discount_valid_until = db.Column(db.Date, nullable=True)        
@@ -48,6 +48,11 @@ class User(db.Model):
         cascade="save-update",
     )
 
+    __table_args__ = (
+        # manager commuter list: WHERE role = ... ORDER BY last_name, first_name
+        db.Index("ix_users_role_name", "role", "last_name", "first_name"),
+    )
+
     # ── Helpers ─────────────────────────────────────────────────────────────
     def set_password(self, raw: str) -> None:
         self.password_hash = generate_password_hash(raw)
@@ -90,7 +90,7 @@ class TopUp(db.Model):
     __tablename__ = "wallet_topups"
 
     id           = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    account_id   = db.Column(db.Integer, db.ForeignKey("wallet_accounts.user_id"), nullable=False, index=True)
+    account_id   = db.Column(db.Integer, db.ForeignKey("wallet_accounts.user_id"), nullable=False)
 
     # Operator-less: no pao_id / teller_id
     method       = db.Column(db.Enum("cash", "gcash", 'maya',  name="topup_method"), nullable=False, default="cash")
@@ -105,6 +105,11 @@ class TopUp(db.Model):
 
     created_at   = db.Column(db.DateTime, server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        # per-commuter top-up lists/stats: account_id = ? AND status = ? AND created_at range
+        db.Index("ix_wallet_topups_account_status_created", "account_id", "status", "created_at"),
+    )
+
     # Back-compat helper in CENTS (different name)
     @property
     def amount_cents(self) -> int:
@@ -43,7 +43,7 @@ from uuid import uuid4
 
 import paho.mqtt.client as mqtt
 from dateutil import parser as dtparse
-from sqlalchemy import create_engine, func, text, event
+from sqlalchemy import create_engine, text, event
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base, mapped_column
 from sqlalchemy import Integer, String, Date, Time
 
@@ -149,10 +149,11 @@ def _find_bus_by_device(sess, device_id: str) -> Optional[Bus]:
     if not dev:
         return None
 
-    # 1) exact identifier match
+    # 1) exact identifier match (case-insensitive via the column's _ci collation, so the
+    #    unique index is used instead of scanning LOWER(identifier))
     bus = (
         sess.query(Bus)
-        .filter(func.lower(Bus.identifier) == dev.lower())
+        .filter(Bus.identifier == dev)
         .first()
     )
     if bus:
@@ -170,7 +171,7 @@ def _find_bus_by_device(sess, device_id: str) -> Optional[Bus]:
         candidates = [f"bus-{want}", f"bus-{want:02d}", f"bus-{want:03d}", f"bus-{want:04d}"]
         bus = (
             sess.query(Bus)
-            .filter(func.lower(Bus.identifier).in_([c.lower() for c in candidates]))
+            .filter(Bus.identifier.in_(candidates))
             .first()
         )
         if bus:
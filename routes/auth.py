@@ -125,7 +125,7 @@ def _debug_dump_pao_state(user_id: int, day):
                 SELECT a.id, a.user_id, a.bus_id,
                        CAST(a.service_date AS CHAR) AS service_date_txt
                 FROM pao_assignments a
-                WHERE a.user_id=:uid AND DATE(a.service_date)=:d
+                WHERE a.user_id=:uid AND a.service_date=:d
                 ORDER BY a.id DESC
                 LIMIT 1
             """
@@ -139,7 +139,7 @@ def _debug_dump_pao_state(user_id: int, day):
                 SELECT a.id, a.user_id, a.bus_id,
                        CAST(a.service_date AS CHAR) AS service_date_txt
                 FROM pao_assignments a
-                WHERE DATE(a.service_date)=:d
+                WHERE a.service_date=:d
                 ORDER BY a.bus_id
             """
             ),
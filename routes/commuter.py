@@ -7,9 +7,9 @@ from typing import Any, Dict, List, Optional
 
 from flask import (
     Blueprint, request, jsonify, g, current_app, url_for,
-    redirect, send_file, make_response
+    redirect, send_file, make_response, abort
 )
-from sqlalchemy import func, text, or_
+from sqlalchemy import func, text, or_, select
 
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import text
@@ -29,6 +29,7 @@ from models.device_token import DeviceToken
 from models.fare_segment import FareSegment
 from utils.qr import build_qr_payload
 from utils.push import push_to_user
+from utils.timefmt import as_time, fmt_hhmm
 from io import BytesIO
 from itsdangerous import URLSafeSerializer
 from PIL import Image, ImageDraw, ImageFont
@@ -475,8 +476,8 @@ def dashboard():
         trip, identifier = next_trip_row
         next_trip = {
             "bus": (identifier or "").replace("bus-", "Bus "),
-            "start": _as_time(trip.start_time).strftime("%H:%M") if _as_time(trip.start_time) else "",
-            "end": _as_time(trip.end_time).strftime("%H:%M") if _as_time(trip.end_time) else "",
+            "start": fmt_hhmm(trip.start_time),
+            "end": fmt_hhmm(trip.end_time),
         }
     else:
         next_trip = None
@@ -537,14 +538,14 @@ def dashboard():
             events.append({
                 "type": "trip",
                 "label": "In Transit",
-                "start": _as_time(t.start_time),
-                "end": _as_time(t.end_time),
+                "start": as_time(t.start_time),
+                "end": as_time(t.end_time),
                 "description": "",
             })
         else:
             for idx, st in enumerate(sts):
-                s = _as_time(st.arrive_time or st.depart_time)
-                e = _as_time(st.depart_time or st.arrive_time)
+                s = as_time(st.arrive_time or st.depart_time)
+                e = as_time(st.depart_time or st.arrive_time)
                 if s or e:
                     events.append({
                         "type": "stop",
@@ -555,8 +556,8 @@ def dashboard():
                     })
                 if idx < len(sts) - 1:
                     nxt = sts[idx + 1]
-                    s2 = _as_time(st.depart_time or st.arrive_time)
-                    e2 = _as_time(nxt.arrive_time or nxt.depart_time)
+                    s2 = as_time(st.depart_time or st.arrive_time)
+                    e2 = as_time(nxt.arrive_time or nxt.depart_time)
                     if s2 and e2 and s2 != e2:
                         events.append({
                             "type": "trip",
@@ -576,14 +577,14 @@ def dashboard():
                     "trip_id": t.id,
                     "type": ev["type"],
                     "label": ev["label"],
-                    "start": ev["start"].strftime("%H:%M"),
-                    "end": ev["end"].strftime("%H:%M"),
+                    "start": fmt_hhmm(ev["start"]),
+                    "end": fmt_hhmm(ev["end"]),
                     "description": ev["description"],
                 })
                 break
 
-        ts = _as_time(t.start_time)
-        te = _as_time(t.end_time)
+        ts = as_time(t.start_time)
+        te = as_time(t.end_time)
         if not chosen and ts and te and _is_live_window(now_time_local, ts, te, grace_min=0):
             live_now.append({
                 "bus_id": t.bus_id,
@@ -591,8 +592,8 @@ def dashboard():
                 "trip_id": t.id,
                 "type": "trip",
                 "label": "In Transit",
-                "start": ts.strftime("%H:%M"),
-                "end": te.strftime("%H:%M"),
+                "start": fmt_hhmm(ts),
+                "end": fmt_hhmm(te),
                 "description": "",
             })
 
@@ -1525,20 +1526,24 @@ def commuter_ticket_receipt_qr(ticket_id: int):
     return resp
 
 
-def _as_time(v: Any) -> Optional[dt.time]:
-    if v is None:
-        return None
-    if isinstance(v, dt.datetime):
-        return v.time().replace(tzinfo=None)
-    if isinstance(v, dt.time):
-        return v.replace(tzinfo=None)
-    if isinstance(v, str):
-        for fmt in ("%H:%M:%S", "%H:%M"):
-            try:
-                return dt.datetime.strptime(v, fmt).time()
-            except ValueError:
-                pass
-    return None
+def _trip_end_stops():
+    """
+    (origin, destination) stop-name columns correlated to Trip.id: the trip's first/last
+    StopTime by (seq, id), each a LIMIT 1 subquery served by ix_stoptime_trip_seq.
+    Select them alongside any set of trips to get every endpoint in the same query.
+    """
+    def _end(*order_by):
+        return (
+            select(StopTime.stop_name)
+            .where(StopTime.trip_id == Trip.id)
+            .order_by(*order_by)
+            .limit(1)
+            .scalar_subquery()
+        )
+    return (
+        _end(StopTime.seq.asc(), StopTime.id.asc()).label("origin"),
+        _end(StopTime.seq.desc(), StopTime.id.desc()).label("destination"),
+    )
 
 @commuter_bp.route("/qr/ticket/<int:ticket_id>.jpg", methods=["GET"])
 def qr_image_for_ticket(ticket_id: int):
@@ -1698,8 +1703,8 @@ def list_all_trips():
             {
                 "id": trip.id,
                 "bus_identifier": identifier,
-                "start_time": _as_time(trip.start_time).strftime("%H:%M") if _as_time(trip.start_time) else "",
-                "end_time": _as_time(trip.end_time).strftime("%H:%M") if _as_time(trip.end_time) else "",
+                "start_time": fmt_hhmm(trip.start_time),
+                "end_time": fmt_hhmm(trip.end_time),
                 "origin": "N/A",
                 "destination": "N/A",
             }
@@ -1707,71 +1712,43 @@ def list_all_trips():
         ]
         return jsonify(result), 200
 
-    # ✅ Normal path (when stop_times exists): derive origin/destination via subqueries
-    first_stop_sq = (
-        db.session.query(StopTime.trip_id, func.min(StopTime.seq).label("min_seq"))
-        .group_by(StopTime.trip_id)
-        .subquery()
-    )
-    first_stop_name_sq = (
-        db.session.query(StopTime.trip_id, StopTime.stop_name.label("origin"))
-        .join(
-            first_stop_sq,
-            (StopTime.trip_id == first_stop_sq.c.trip_id)
-            & (StopTime.seq == first_stop_sq.c.min_seq),
-        )
-        .subquery()
-    )
-    last_stop_sq = (
-        db.session.query(StopTime.trip_id, func.max(StopTime.seq).label("max_seq"))
-        .group_by(StopTime.trip_id)
-        .subquery()
-    )
-    last_stop_name_sq = (
-        db.session.query(StopTime.trip_id, StopTime.stop_name.label("destination"))
-        .join(
-            last_stop_sq,
-            (StopTime.trip_id == last_stop_sq.c.trip_id)
-            & (StopTime.seq == last_stop_sq.c.max_seq),
-        )
-        .subquery()
-    )
-
-    trips = (
-        db.session.query(Trip, Bus.identifier, first_stop_name_sq.c.origin, last_stop_name_sq.c.destination)
+    # ✅ Normal path (when stop_times exists): origin/destination per trip via correlated
+    #    first/last-stop subqueries (index seeks for just these trips, no whole-table MIN/MAX)
+    origin_col, destination_col = _trip_end_stops()
+    trips = db.session.execute(
+        select(Trip.id, Bus.identifier, Trip.start_time, Trip.end_time, origin_col, destination_col)
         .join(Bus, Trip.bus_id == Bus.id)
-        .outerjoin(first_stop_name_sq, Trip.id == first_stop_name_sq.c.trip_id)
-        .outerjoin(last_stop_name_sq, Trip.id == last_stop_name_sq.c.trip_id)
-        .filter(Trip.service_date == svc_date)
+        .where(Trip.service_date == svc_date)
         .order_by(Trip.start_time.asc())
-        .all()
-    )
+    ).all()
 
     result = [
         {
-            "id": trip.id,
+            "id": tid,
             "bus_identifier": identifier,
-            "start_time": _as_time(trip.start_time).strftime("%H:%M") if _as_time(trip.start_time) else "",
-            "end_time": _as_time(trip.end_time).strftime("%H:%M") if _as_time(trip.end_time) else "",
+            "start_time": fmt_hhmm(start),
+            "end_time": fmt_hhmm(end),
             "origin": origin or "N/A",
             "destination": destination or "N/A",
         }
-        for trip, identifier, origin, destination in trips
+        for tid, identifier, start, end, origin, destination in trips
     ]
     return jsonify(result), 200
 
 @commuter_bp.route("/buses", methods=["GET"])
 def list_buses():
     date_str = request.args.get("date")
-    q = Bus.query
+    # Column rows, not Bus entities (nothing here needs the ORM objects)
+    q = select(Bus.id, Bus.identifier)
     if date_str:
         try:
             svc_date = dt.datetime.strptime(date_str, "%Y-%m-%d").date()
         except ValueError:
             return jsonify(error="date must be YYYY-MM-DD"), 400
-        q = q.join(Trip, Bus.id == Trip.bus_id).filter(Trip.service_date == svc_date)
-    buses = q.order_by(Bus.identifier.asc()).all()
-    return jsonify([{"id": b.id, "identifier": b.identifier} for b in buses]), 200
+        # DISTINCT: one row per bus however many trips it runs (Query used to unique entities)
+        q = q.join(Trip, Bus.id == Trip.bus_id).where(Trip.service_date == svc_date).distinct()
+    buses = db.session.execute(q.order_by(Bus.identifier.asc())).all()
+    return jsonify([{"id": bid, "identifier": ident} for bid, ident in buses]), 200
 
 @commuter_bp.route("/bus-trips", methods=["GET"])
 @require_role("commuter")
@@ -1785,19 +1762,19 @@ def commuter_bus_trips():
     except ValueError:
         return jsonify(error="date must be YYYY-MM-DD"), 400
 
-    trips = (
-        Trip.query.filter_by(bus_id=bus_id, service_date=svc_date)
+    trips = db.session.execute(
+        select(Trip.id, Trip.number, Trip.start_time, Trip.end_time)
+        .where(Trip.bus_id == bus_id, Trip.service_date == svc_date)
         .order_by(Trip.start_time.asc())
-        .all()
-    )
+    ).all()
     return jsonify([
         {
-            "id": t.id,
-            "number": t.number,
-            "start_time": _as_time(t.start_time).strftime("%H:%M") if _as_time(t.start_time) else "",
-            "end_time": _as_time(t.end_time).strftime("%H:%M") if _as_time(t.end_time) else "",
+            "id": tid,
+            "number": number,
+            "start_time": fmt_hhmm(start),
+            "end_time": fmt_hhmm(end),
         }
-        for t in trips
+        for tid, number, start, end in trips
     ]), 200
 
 from sqlalchemy.exc import ProgrammingError, OperationalError
@@ -1810,10 +1787,11 @@ def commuter_stop_times():
         return jsonify(error="trip_id is required"), 400
 
     try:
-        sts = (StopTime.query
-               .filter_by(trip_id=trip_id)
-               .order_by(StopTime.seq.asc())
-               .all())
+        sts = db.session.execute(
+            select(StopTime.stop_name, StopTime.arrive_time, StopTime.depart_time)
+            .where(StopTime.trip_id == trip_id)
+            .order_by(StopTime.seq.asc())
+        ).all()
     except (ProgrammingError, OperationalError) as e:
         # MySQL error code 1146 = table doesn't exist
         code = None
@@ -1828,11 +1806,11 @@ def commuter_stop_times():
 
     return jsonify([
         {
-            "stop_name": st.stop_name,
-            "arrive_time": (_as_time(st.arrive_time).strftime("%H:%M") if _as_time(st.arrive_time) else ""),
-            "depart_time": (_as_time(st.depart_time).strftime("%H:%M") if _as_time(st.depart_time) else ""),
+            "stop_name": name,
+            "arrive_time": fmt_hhmm(arrive),
+            "depart_time": fmt_hhmm(depart),
         }
-        for st in sts
+        for name, arrive, depart in sts
     ]), 200
 
 
@@ -2098,25 +2076,21 @@ def commuter_get_ticket_batch(ticket_id: int):
 @commuter_bp.route("/trips/<int:trip_id>", methods=["GET"])
 @require_role("commuter")
 def get_trip(trip_id: int):
-    trip = Trip.query.get_or_404(trip_id)
-    first_stop = (
-        StopTime.query.filter_by(trip_id=trip_id)
-        .order_by(StopTime.seq.asc(), StopTime.id.asc())
-        .first()
-    )
-    last_stop = (
-        StopTime.query.filter_by(trip_id=trip_id)
-        .order_by(StopTime.seq.desc(), StopTime.id.desc())
-        .first()
-    )
+    # Trip + first/last stop names in one round trip
+    row = db.session.execute(
+        select(Trip.number, Trip.start_time, Trip.end_time, *_trip_end_stops()).where(Trip.id == trip_id)
+    ).first()
+    if row is None:
+        abort(404)
+    number, start_time, end_time, origin, destination = row
 
     return jsonify(
-        id=trip.id,
-        number=trip.number,
-        origin=first_stop.stop_name if first_stop else "",
-        destination=last_stop.stop_name if last_stop else "",
-        start_time=_as_time(trip.start_time).strftime("%H:%M") if _as_time(trip.start_time) else "",
-        end_time=_as_time(trip.end_time).strftime("%H:%M") if _as_time(trip.end_time) else "",
+        id=trip_id,
+        number=number,
+        origin=origin or "",
+        destination=destination or "",
+        start_time=fmt_hhmm(start_time),
+        end_time=fmt_hhmm(end_time),
     ), 200
 
 @commuter_bp.route("/timetable", methods=["GET"])
@@ -2126,18 +2100,18 @@ def timetable():
     if not trip_id:
         return jsonify(error="trip_id is required"), 400
 
-    sts = (
-        StopTime.query.filter_by(trip_id=trip_id)
+    sts = db.session.execute(
+        select(StopTime.stop_name, StopTime.arrive_time, StopTime.depart_time)
+        .where(StopTime.trip_id == trip_id)
         .order_by(StopTime.seq.asc(), StopTime.id.asc())
-        .all()
-    )
+    ).all()
     return jsonify([
         {
-            "stop": st.stop_name,
-            "arrive": (_as_time(st.arrive_time).strftime("%H:%M") if _as_time(st.arrive_time) else ""),
-            "depart": (_as_time(st.depart_time).strftime("%H:%M") if _as_time(st.depart_time) else ""),
+            "stop": name,
+            "arrive": fmt_hhmm(arrive),
+            "depart": fmt_hhmm(depart),
         }
-        for st in sts
+        for name, arrive, depart in sts
     ]), 200
 
 @commuter_bp.route("/schedule", methods=["GET"])
@@ -2155,9 +2129,7 @@ def schedule():
         .all()
     )
 
-    def fmt(t):
-        tt = _as_time(t)
-        return tt.strftime("%H:%M") if tt else ""
+    fmt = fmt_hhmm
 
     events = []
     if len(stops) == 0:
@@ -2171,8 +2143,8 @@ def schedule():
         })
     else:
         for idx, st in enumerate(stops):
-            s = _as_time(st.arrive_time) or _as_time(st.depart_time)
-            e = _as_time(st.depart_time) or _as_time(st.arrive_time)
+            s = as_time(st.arrive_time) or as_time(st.depart_time)
+            e = as_time(st.depart_time) or as_time(st.arrive_time)
             if s or e:
                 events.append({
                     "id": idx * 2 + 1,
@@ -2184,8 +2156,8 @@ def schedule():
                 })
             if idx < len(stops) - 1:
                 nxt = stops[idx + 1]
-                s2 = _as_time(st.depart_time) or _as_time(st.arrive_time)
-                e2 = _as_time(nxt.arrive_time) or _as_time(nxt.depart_time)
+                s2 = as_time(st.depart_time) or as_time(st.arrive_time)
+                e2 = as_time(nxt.arrive_time) or as_time(nxt.depart_time)
                 if s2 and e2 and s2 != e2:
                     events.append({
                         "id": idx * 2 + 2,
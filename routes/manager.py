@@ -1,16 +1,27 @@
 # backend/routes/manager.py
 from __future__ import annotations
 
+import atexit
+import hashlib
+import io
+import logging
+import mimetypes
 import os
+import queue
+import shutil
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
-from werkzeug.utils import secure_filename
-from flask import Blueprint, request, jsonify, send_from_directory, current_app, g
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from datetime import date, datetime, time as dtime, timedelta, timezone
+from flask import Blueprint, request, jsonify, send_from_directory, current_app, g, abort, stream_with_context
 from routes.commuter import _payment_method_for_ticket
 
 # ✅ add or_ (and and_ if you ever need it)
-from sqlalchemy import func, text, literal, or_, case
-from sqlalchemy.orm import aliased
+from sqlalchemy import bindparam, func, text, literal, literal_column, or_, case, select, update, event, lambda_stmt, cast, Date, Integer
+from sqlalchemy.orm import Session, aliased, load_only
+from sqlalchemy.orm.attributes import set_committed_value
 
 from db import db
 # ❌ remove this if you’re moving the guard into auth_guard
@@ -20,13 +31,17 @@ from auth_guard import require_role
 import secrets, string
 
 from utils.push import push_to_user
-from sqlalchemy.exc import IntegrityError
+from utils.timefmt import fmt_hhmm
+from utils.reason_log import append_reason, ensure_log_dir, log_dir
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from models.bus import Bus
-from models.schedule import Trip
+from models.schedule import Trip, StopTime
 from models.qr_template import QRTemplate
 from models.fare_segment import FareSegment
 from models.sensor_reading import SensorReading
 from models.ticket_sale import TicketSale
+from models.ticket_sale_daily import TicketSaleDaily, TicketSaleDailyDay
+from tasks.rollup_ticket_sales import invalidate_rollup_days
 from models.user import User
 from models.ticket_stop import TicketStop
 from models.trip_metric import TripMetric
@@ -44,18 +59,21 @@ def _slugify(s: str) -> str:
     return s.strip("-")
 
 def _debug_dump_pao_for_day(day):
+    # Costs a query: only when the manager logger is actually at DEBUG
+    if not current_app.logger.isEnabledFor(logging.DEBUG):
+        return
     try:
         rows = db.session.execute(
             text("""
                 SELECT a.id, a.user_id, a.bus_id,
                        CAST(a.service_date AS CHAR) AS service_date_txt
                 FROM pao_assignments a
-                WHERE DATE(a.service_date)=:d
+                WHERE a.service_date=:d
                 ORDER BY a.bus_id
             """),
             {"d": day}
         ).mappings().all()
-        current_app.logger.info("[pao-assignments][DEBUG] %s -> %s", day, [dict(r) for r in rows])
+        current_app.logger.debug("[pao-assignments][DEBUG] %s -> %s", day, [dict(r) for r in rows])
     except Exception:
         current_app.logger.exception("[pao-assignments][DEBUG] dump failed day=%s", day)
 
@@ -77,6 +95,7 @@ def _gen_unique_username(seed: str) -> str:
 
 MNL_TZ = timezone(timedelta(hours=8))
 VOID_WINDOW_HOURS = 24
+_VOID_WINDOW_S = VOID_WINDOW_HOURS * 3600
 
 def _to_utc_z(dt):
     if not dt:
@@ -87,32 +106,217 @@ def _to_utc_z(dt):
 
 UPLOAD_DIR = os.path.join(os.getcwd(), "uploads")
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+_UPLOAD_COPY_BUF = 1 << 20  # 1 MiB
+_QR_EXTS = frozenset({"png", "jpg", "jpeg"})
+_QR_MAX_AGE_S = 31536000  # QR files are immutable (random names, never rewritten)
+
+def _save_upload(file, path: str) -> None:
+    """
+    Write an uploaded FileStorage to `path`.
+    Werkzeug spools large bodies to a real temp file: copy those kernel-side with
+    os.sendfile; small in-memory bodies go through one big-buffer copy.
+    """
+    src = file.stream
+    src.seek(0)
+    try:
+        in_fd = src.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        in_fd = None
+
+    with open(path, "wb", buffering=_UPLOAD_COPY_BUF) as out:
+        if in_fd is not None and hasattr(os, "sendfile"):
+            size = os.fstat(in_fd).st_size
+            offset = 0
+            while offset < size:
+                sent = os.sendfile(out.fileno(), in_fd, offset, size - offset)
+                if not sent:
+                    break
+                offset += sent
+        else:
+            shutil.copyfileobj(src, out, _UPLOAD_COPY_BUF)
 
 manager_bp = Blueprint("manager", __name__, url_prefix="/manager")
 
+# Optional fast JSON encoder (falls back to jsonify when not installed)
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore[assignment]
+
+def _json_response(obj, status: int = 200):
+    """Serialize large list payloads with orjson when available."""
+    if orjson is None:
+        return jsonify(obj), status
+    # Same fallback as the app's JSON provider for Decimal/date/UUID values
+    default = getattr(current_app.json, "default", None)
+    return current_app.response_class(orjson.dumps(obj, default=default), status=status, mimetype="application/json")
+
+_STREAM_BATCH = 500
+
+def _stream_json_array(items, key: str | None = None, trailer=None):
+    """
+    Stream an iterable of dicts as a JSON array, encoded _STREAM_BATCH items at a time, so
+    the body is written while rows are still arriving. With `key` the array is that key's
+    value in a JSON object, and `trailer` (a callable, evaluated once the items are
+    exhausted, e.g. for a trailing count) returns the object's remaining keys.
+
+    The first batch is encoded before the response starts, so a failing query is still an
+    ordinary error response. A failure after that cannot take back the 200 already sent:
+    it is logged and the body ends without its closing brackets, so clients get malformed
+    JSON rather than a short list that parses as complete.
+    """
+    if orjson is not None:
+        default = getattr(current_app.json, "default", None)
+        dump = lambda o: orjson.dumps(o, default=default)
+    else:
+        dump = lambda o: current_app.json.dumps(o).encode()
+
+    def batches():
+        buf = []
+        for item in items:
+            buf.append(dump(item))
+            if len(buf) >= _STREAM_BATCH:
+                yield b",".join(buf)
+                buf = []
+        if buf:
+            yield b",".join(buf)
+
+    def close() -> bytes:
+        if key is None:
+            return b"]"
+        rest = trailer() if trailer is not None else {}
+        return b"]" + b"".join(b"," + dump(k) + b":" + dump(v) for k, v in rest.items()) + b"}"
+
+    chunks = batches()
+    first = next(chunks, None)
+
+    def generate():
+        yield b"[" if key is None else b"{" + dump(key) + b":["
+        try:
+            if first is not None:
+                yield first
+                for chunk in chunks:
+                    yield b"," + chunk
+            yield close()
+        except Exception:
+            current_app.logger.exception("[manager] streamed response for %s failed mid-body", request.path)
+            db.session.rollback()
+
+    return current_app.response_class(stream_with_context(generate()), mimetype="application/json")
+
 # Optional realtime publish (best-effort / no-op if module missing)
 try:
     from mqtt_ingest import publish as mqtt_publish
 except Exception:
     mqtt_publish = None  # type: ignore[assignment]
 
-def _active_trip_for(bus_id: int, ts: datetime):
-    """Find the trip whose time window contains ts (handles past-midnight windows)."""
-    day = ts.date()
-    prev = (ts - timedelta(days=1)).date()
-    candidates = (
-        Trip.query.filter(Trip.bus_id == bus_id, Trip.service_date.in_([day, prev]))
-        .order_by(Trip.start_time.asc())
-        .all()
-    )
-    for t in candidates:
-        start = datetime.combine(t.service_date, t.start_time)
-        end = datetime.combine(t.service_date, t.end_time)
-        if t.end_time <= t.start_time:  # past midnight
-            end = end + timedelta(days=1)
-        if start <= ts < end:
-            return t
-    return None
+@lru_cache(maxsize=1024)
+def _parse_iso_date(s: str) -> date:
+    """Fast strict YYYY-MM-DD parser; raises ValueError like strptime."""
+    if len(s) != 10 or s[4] != "-" or s[7] != "-":
+        raise ValueError(f"invalid date: {s!r}")
+    return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+
+_DAY = timedelta(days=1)
+
+def _want_total() -> bool:
+    """?with_total=1|0 (default 1). With 0, list endpoints skip the total and report has_next only."""
+    return request.args.get("with_total", "1").strip().lower() not in {"0", "false", "no"}
+
+# MySQL DATE_FORMAT equivalents of datetime.isoformat() (second precision) and "%Y-%m-%d %H:%M"
+_SQL_ISO_FMT = "%Y-%m-%dT%H:%i:%s"
+_SQL_MINUTE_FMT = "%Y-%m-%d %H:%i"
+
+def _fmt_minute(d: datetime) -> str:
+    """"YYYY-MM-DD HH:MM" without strftime (per-row formatting in ticket lists)."""
+    return f"{d.year:04d}-{d.month:02d}-{d.day:02d} {d.hour:02d}:{d.minute:02d}"
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MS = timedelta(milliseconds=1)
+
+def _epoch_ms(d: datetime) -> int:
+    """Naive-UTC datetime → epoch milliseconds (the `ts=ms` wire format)."""
+    return (d - _EPOCH) // _ONE_MS
+
+def _want_epoch_ms() -> bool:
+    """ts=ms → emit epoch-millisecond ints instead of ISO strings (default ts=iso)."""
+    return (request.args.get("ts") or "").strip().lower() == "ms"
+
+_METRICS_MAX_AGE_S = 30
+
+# ── Report response cache (per process) ─────────────────────────────────
+# Idempotent report GETs are pure functions of their query string: keep the rendered body
+# briefly. Every window, closed or not, expires after _REPORT_TTL_S: a void only clears the
+# cache of the worker that commits it, so the short TTL is what bounds how long the other
+# gunicorn workers can serve pre-void numbers. Edits to the reference data (buses, QR
+# templates) cached here clear the local worker too.
+_REPORT_TTL_S = _METRICS_MAX_AGE_S
+_REFERENCE_TTL_S = 120      # fare segments / QR templates: change only via manager edits
+_BUSES_TTL_S = 5            # bus list carries live occupancy
+_REPORT_CACHE_MAX = 256
+_report_cache: dict[tuple, tuple[float, bytes, int, list]] = {}
+_report_cache_lock = threading.Lock()
+_report_gen = 0
+
+def _clear_report_cache() -> None:
+    global _report_gen
+    with _report_cache_lock:
+        _report_gen += 1
+        _report_cache.clear()
+
+@event.listens_for(Session, "after_commit")
+def _clear_reports_on_ticket_change(session):
+    if session.info.pop("tickets_changed", False):
+        _clear_report_cache()
+
+def _cached_get(ttl: float):
+    """Serve repeat GETs of the view (same endpoint + query string) from the report cache
+    for `ttl` seconds."""
+    def decorator(view):
+        return _cached_view(view, ttl)
+    return decorator
+
+def _cached_view(view, ttl: float):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (request.endpoint, tuple(sorted(request.args.items(multi=True))))
+        now = time.monotonic()
+        with _report_cache_lock:
+            hit = _report_cache.get(key)
+        if hit and hit[0] > now:
+            _, body, status, headers = hit
+            return current_app.response_class(body, status=status, headers=headers).make_conditional(request)
+
+        gen = _report_gen
+        resp = current_app.make_response(view(*args, **kwargs))
+        if resp.status_code == 200:
+            entry = (
+                now + ttl,
+                resp.get_data(),
+                resp.status_code,
+                list(resp.headers.items()),
+            )
+            with _report_cache_lock:
+                if gen == _report_gen:  # no ticket change committed while we were computing
+                    if key not in _report_cache and len(_report_cache) >= _REPORT_CACHE_MAX:
+                        _report_cache.pop(next(iter(_report_cache)))
+                    _report_cache[key] = entry
+        return resp
+    return wrapper
+
+_cached_report = _cached_get(_REPORT_TTL_S)
+
+def _parse_day_start(s: str) -> datetime:
+    """_parse_iso_date() as a naive midnight datetime (what strptime("%Y-%m-%d") returned)."""
+    return datetime.combine(_parse_iso_date(s.strip()), dtime.min)
+
+@lru_cache(maxsize=1024)
+def _parse_hhmm(s: str) -> dtime:
+    """Fast H:MM / HH:MM parser; raises ValueError like strptime."""
+    hh, sep, mm = s.partition(":")
+    if not sep or not (1 <= len(hh) <= 2) or len(mm) != 2:
+        raise ValueError(f"invalid time: {s!r}")
+    return dtime(int(hh), int(mm))
 
 def _as_php(x) -> int:
     try:
@@ -120,18 +324,22 @@ def _as_php(x) -> int:
     except Exception:
         return 0
 
-def _topup_reason_path(tid: int) -> str:
-    # mirror teller: static/topup_receipts/{id}.reject.txt
-    return os.path.join(current_app.root_path, "static", "topup_receipts", f"{tid}.reject.txt")
+# Reason log dir captured at registration, so the void path needn't go through current_app
+_REASON_LOG_DIR: str | None = None
+
+@manager_bp.record_once
+def _init_reason_log(state) -> None:
+    global _REASON_LOG_DIR
+    _REASON_LOG_DIR = log_dir(state.app)
+    try:
+        ensure_log_dir(state.app)
+    except OSError:
+        state.app.logger.exception("[manager] cannot create top-up reason log dir")
 
 def _save_topup_void_reason(tid: int, text_: str | None) -> None:
-    if not (text_ and text_.strip()):
-        return
+    """Queue the reason on the shared append-only log (read back by teller's reject_reason)."""
     try:
-        p = _topup_reason_path(tid)
-        os.makedirs(os.path.dirname(p), exist_ok=True)
-        with open(p, "w", encoding="utf-8") as f:
-            f.write(text_.strip())
+        append_reason(_REASON_LOG_DIR or log_dir(current_app), tid, text_)
     except Exception:
         current_app.logger.exception("[manager] write topup void reason failed tid=%s", tid)
 
@@ -226,60 +434,223 @@ def _random_password(n: int = 10) -> str:
     alphabet = string.ascii_letters + string.digits
     return "".join(secrets.choice(alphabet) for _ in range(n))
 
+@lru_cache(maxsize=None)
+def _schema_cols(table: str) -> frozenset[str]:
+    """
+    Column names of `table`, read from information_schema once per process.
+    Clear with _schema_cols.cache_clear() (or POST /manager/_schema/flush) after a migration.
+    """
+    rows = db.session.execute(
+        text(
+            """
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = DATABASE()
+              AND table_name   = :t
+        """
+        ),
+        {"t": table},
+    ).scalars().all()
+    return frozenset(str(c).lower() for c in rows)
+
 def table_has_column(table: str, column: str) -> bool:
+    return column.lower() in _schema_cols(table)
+
+# tables whose optional columns the ticket/wallet handlers probe on every request
+_SCHEMA_PRELOAD = ("ticket_sales", "wallet_accounts", "wallet_ledger", "wallet_topups")
+
+def _index_exists(table: str, name: str) -> bool:
     row = db.session.execute(
         text(
             """
-            SELECT COUNT(*) AS c
-            FROM information_schema.columns
+            SELECT 1
+            FROM information_schema.statistics
             WHERE table_schema = DATABASE()
               AND table_name   = :t
-              AND column_name  = :c
+              AND index_name   = :i
+            LIMIT 1
         """
         ),
-        {"t": table, "c": column},
-    ).mappings().first()
-    return bool(row and int(row["c"]) > 0)
+        {"t": table, "i": name},
+    ).first()
+    return bool(row)
 
-def _is_ticket_void_row(row) -> bool:
-    """Determine if a ticket row is voided, supporting both schemas."""
+def _ensure_index(table: str, name: str, cols: str) -> None:
+    """
+    Dev-friendly: create an index if missing (MySQL has no CREATE INDEX IF NOT EXISTS).
+    If you use migrations, do this there instead.
+    """
     try:
-        if bool(getattr(row, "voided")):
-            return True
+        if not _index_exists(table, name):
+            db.session.execute(text(f"CREATE INDEX {name} ON {table} ({cols})"))
+            db.session.commit()
     except Exception:
-        pass
+        db.session.rollback()
+        current_app.logger.exception("[manager] ensure index %s on %s failed", name, table)
+
+# (table, index name, columns) backing the manager dashboards; mirrored on the models.
+_MANAGER_INDEXES = [
+    ("ticket_sales",    "ix_ticketsale_created_bus_price", "created_at, bus_id, price"),
+    ("sensor_readings", "ix_sensorreading_bus_ts_id_counts", "bus_id, timestamp, id, total_count, in_count, out_count"),
+    ("trips",           "ix_trip_bus_date_start",          "bus_id, service_date, start_time"),
+    ("stop_times",      "ix_stoptime_trip_seq",            "trip_id, seq, id"),
+    ("users",           "ix_users_role_name",              "role, last_name, first_name"),
+    ("ticket_sales",    "ix_ticketsale_user_created",      "user_id, created_at"),
+    ("ticket_sales",    "ix_ticketsale_bus_created_price", "bus_id, created_at, price"),
+    ("ticket_sales",    "ix_ticketsale_user_void_created", "user_id, voided, created_at, price"),
+    ("wallet_topups",   "ix_wallet_topups_account_status_created", "account_id, status, created_at"),
+]
+
+# (table, index, composite that supersedes it — its columns as a prefix, or the same columns
+# reordered for more queries): dropped once the composite exists
+_REDUNDANT_INDEXES = [
+    ("users",           "ix_users_role",               "ix_users_role_name"),
+    ("wallet_topups",   "ix_wallet_topups_account_id", "ix_wallet_topups_account_status_created"),
+    ("sensor_readings", "ix_sensorreading_bus_ts",     "ix_sensorreading_bus_ts_id_counts"),
+    ("sensor_readings", "ix_sensorreading_bus_ts_counts", "ix_sensorreading_bus_ts_id_counts"),
+    ("ticket_sales",    "ix_ticketsale_bus_created",   "ix_ticketsale_bus_created_price"),
+]
+
+def _drop_redundant_index(table: str, name: str, covering: str) -> None:
+    """Dev-friendly: drop `name` when `covering` (same leading column) is in place."""
     try:
-        st = (getattr(row, "status", None) or "").strip().lower()
-        if st in {"void", "voided", "refunded", "cancelled", "canceled"}:
-            return True
+        if _index_exists(table, name) and _index_exists(table, covering):
+            db.session.execute(text(f"DROP INDEX {name} ON {table}"))
+            db.session.commit()
     except Exception:
-        pass
-    return False
+        db.session.rollback()
+        current_app.logger.exception("[manager] drop index %s on %s failed", name, table)
 
-def _amount_pesos_from_price(price) -> int:
+_BUS_IDENTIFIER_COLLATION = "utf8mb4_0900_ai_ci"
+
+def _ensure_bus_identifier_ci() -> None:
+    """
+    Dev-friendly: make buses.identifier case-insensitive so the sensor lookup is a plain
+    equality on its unique index (no LOWER() scan). No-op if it already is.
+    """
     try:
-        return int(round(float(price or 0)))
+        coll = db.session.execute(
+            text(
+                """
+                SELECT collation_name
+                FROM information_schema.columns
+                WHERE table_schema = DATABASE()
+                  AND table_name   = 'buses'
+                  AND column_name  = 'identifier'
+            """
+            )
+        ).scalar()
+        if coll and (coll.endswith("_bin") or coll.endswith("_cs")):
+            db.session.execute(
+                text(
+                    "ALTER TABLE buses MODIFY identifier VARCHAR(64) "
+                    f"CHARACTER SET utf8mb4 COLLATE {_BUS_IDENTIFIER_COLLATION} NOT NULL"
+                )
+            )
+            db.session.commit()
     except Exception:
-        return 0
+        db.session.rollback()
+        current_app.logger.exception("[manager] buses.identifier collation change failed")
 
-def _ensure_wallet_account(user_id: int):
-    """Create wallet_accounts row if missing (pesos schema)."""
-    db.session.execute(
-        text(
+def ensure_manager_indexes() -> None:
+    """
+    Schema changes for the manager endpoints (idempotent): composite indexes, superseded
+    index drops, the buses.identifier collation, wallet_topups.effective_teller_id.
+    DDL — run once per deploy via `flask manager-schema`, never from app startup or a request.
+    """
+    for table, name, cols in _MANAGER_INDEXES:
+        _ensure_index(table, name, cols)
+    for table, name, covering in _REDUNDANT_INDEXES:
+        _drop_redundant_index(table, name, covering)
+    _ensure_bus_identifier_ci()
+    _ensure_topups_effective_teller()
+
+def preload_schema_cache() -> None:
+    """Read the column lists the ticket/wallet handlers probe (information_schema, no DDL)."""
+    for table in _SCHEMA_PRELOAD:
+        _schema_cols(table)
+
+@manager_bp.route("/_schema/flush", methods=["POST"])
+@require_role("admin")
+def flush_schema_cache():
+    """Forget cached column lists (run after applying a migration)."""
+    _schema_cols.cache_clear()
+    for cached in (_topups_teller_col, _commuter_topups_sql, _manager_topups_sql,
+                   _void_reason_col):
+        cached.cache_clear()
+    return jsonify(ok=True), 200
+
+def _ensure_topups_effective_teller() -> None:
+    """
+    Dev-friendly: materialize COALESCE(teller_id, pao_id) as a STORED generated column so the
+    teller filter/join on wallet_topups can use an index instead of an expression. A full
+    table rebuild — part of `flask manager-schema`, never a request.
+    """
+    try:
+        if table_has_column("wallet_topups", "effective_teller_id"):
+            return
+        if not (table_has_column("wallet_topups", "teller_id") and table_has_column("wallet_topups", "pao_id")):
+            return
+        db.session.execute(
+            text(
+                """
+                ALTER TABLE wallet_topups
+                  ADD COLUMN effective_teller_id INT
+                      GENERATED ALWAYS AS (COALESCE(teller_id, pao_id)) STORED,
+                  ADD INDEX ix_wallet_topups_effective_teller (effective_teller_id)
             """
-            INSERT INTO wallet_accounts (user_id, balance_pesos)
-            VALUES (:uid, 0)
-            ON DUPLICATE KEY UPDATE user_id = user_id
-        """
-        ),
-        {"uid": user_id},
+            )
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("[manager] add wallet_topups.effective_teller_id failed")
+    finally:
+        _schema_cols.cache_clear()
+
+def _topups_effective_teller() -> bool:
+    """True when wallet_topups.effective_teller_id exists (added by `flask manager-schema`)."""
+    return table_has_column("wallet_topups", "effective_teller_id")
+
+@lru_cache(maxsize=None)
+def _topups_teller_col() -> str:
+    """SQL expression for the operator that recorded a top-up (teller, else PAO)."""
+    if _topups_effective_teller():
+        return "t.effective_teller_id"
+    if table_has_column("wallet_topups", "teller_id"):
+        return "COALESCE(t.teller_id, t.pao_id)"
+    return "t.pao_id"
+
+_VOID_STATUSES = frozenset({"void", "voided", "refunded", "cancelled", "canceled"})
+_VOID_STATUSES_SQL = tuple(sorted(_VOID_STATUSES))  # for IN (...) filters
+
+def _is_ticket_void_row(row) -> bool:
+    """Determine if a ticket row is voided, supporting both schemas."""
+    return bool(getattr(row, "voided", False)) or (
+        str(getattr(row, "status", None) or "").strip().lower() in _VOID_STATUSES
     )
 
+def _amount_pesos_from_price(price) -> int:
+    try:
+        return int(round(float(price or 0)))
+    except Exception:
+        return 0
+
 def _wallet_tables_exist() -> bool:
     return table_has_column("wallet_accounts", "balance_pesos") and table_has_column(
         "wallet_ledger", "amount_pesos"
     )
 
+_VOID_REASON_COLS = ("void_reason", "reason", "note", "remarks")
+
+@lru_cache(maxsize=None)
+def _void_reason_col(ticket_table: str) -> str | None:
+    """First reason-like column present (void_reason, reason, note, remarks), else None."""
+    for col in _VOID_REASON_COLS:
+        if table_has_column(ticket_table, col):
+            return col
+    return None
+
 def _write_void_reason(ticket_table: str, ticket_id: int, reason: str):
     """
     Persist void reason if a suitable column exists. Priority:
@@ -288,14 +659,9 @@ def _write_void_reason(ticket_table: str, ticket_id: int, reason: str):
     - note / remarks
     No-op if none exist.
     """
-    candidates = []
-    for col in ("void_reason", "reason", "note", "remarks"):
-        if table_has_column(ticket_table, col):
-            candidates.append(col)
-            break
-    if not candidates:
+    col = _void_reason_col(ticket_table)
+    if not col:
         return
-    col = candidates[0]
     db.session.execute(
         text(
             f"UPDATE {ticket_table} SET {col} = :r WHERE id = :tid"
@@ -303,62 +669,130 @@ def _write_void_reason(ticket_table: str, ticket_id: int, reason: str):
         {"r": reason, "tid": ticket_id},
     )
 
-def _mark_ticket_void(ticket: TicketSale, reason: str | None):
+def _set_ticket_state(tickets, values: dict, reason: str | None = None, set_reason: bool = False):
+    """
+    Write paid/voided/status (+ optional reason) for one ticket or a list of tickets as a
+    single UPDATE, keeping only the columns this schema has. Loaded tickets are synced
+    without being marked dirty, so no ORM flush follows. Column names come from fixed whitelists.
     """
-    Mark a TicketSale row voided across schemas:
+    if isinstance(tickets, TicketSale):
+        tickets = [tickets]
+    if not tickets:
+        return
+    sets = {k: v for k, v in values.items() if table_has_column("ticket_sales", k)}
+    params = dict(sets)
+    reason_col = _void_reason_col("ticket_sales") if set_reason else None
+    if reason_col:
+        params["_reason"] = reason
+    if not params:
+        return
+    assignments = [f"{k} = :{k}" for k in sets]
+    if reason_col:
+        assignments.append(f"{reason_col} = :_reason")
+    params["_tids"] = [t.id for t in tickets]
+    db.session.execute(
+        text(f"UPDATE ticket_sales SET {', '.join(assignments)} WHERE id IN :_tids").bindparams(
+            bindparam("_tids", expanding=True)
+        ),
+        params,
+    )
+    for ticket in tickets:
+        for k, v in sets.items():
+            if k in TicketSale.__table__.c:
+                set_committed_value(ticket, k, v)
+            else:
+                setattr(ticket, k, v)  # unmapped (e.g. status): plain attribute for the response
+    if "voided" in sets:
+        # the daily rollup counts non-voided tickets: those days are re-aggregated live
+        invalidate_rollup_days(t.created_at.date() for t in tickets if t.created_at)
+    db.session.info["tickets_changed"] = True  # drop cached reports once this commits
+
+def _mark_ticket_void(ticket, reason: str | None):
+    """
+    Mark a TicketSale row (or a list of them) voided across schemas:
       - if column 'voided' exists: set voided=1
       - else if 'status' exists: set status='voided'
       - always set paid=0 (if exists) for clarity on state
       - optionally persist reason into void_reason/reason/note/remarks when present
     """
-    if table_has_column("ticket_sales", "paid"):
-        ticket.paid = False  # type: ignore[attr-defined]
+    values = {"paid": False}
     if table_has_column("ticket_sales", "voided"):
-        ticket.voided = True  # type: ignore[attr-defined]
-    elif table_has_column("ticket_sales", "status"):
-        setattr(ticket, "status", "voided")
-    if reason:
-        _write_void_reason("ticket_sales", ticket.id, reason)
+        values["voided"] = True
+    else:
+        values["status"] = "voided"
+    _set_ticket_state(ticket, values, reason, set_reason=bool(reason))
 
 def _refund_paid_ticket(ticket: TicketSale, actor_id: int | None) -> dict:
     """
     Refund a paid ticket into the user's wallet if wallet tables exist.
     Returns a dict summary {refunded: bool, balance: int|None}.
     """
-    if not _wallet_tables_exist():
-        return {"refunded": False, "balance": None, "note": "wallet tables missing"}
-    if not ticket.user_id:
-        return {"refunded": False, "balance": None, "note": "no user to refund"}
-
-    amount_pesos = _amount_pesos_from_price(ticket.price)
-    if amount_pesos <= 0:
-        return {"refunded": False, "balance": None, "note": "zero-amount ticket"}
-
-    _ensure_wallet_account(int(ticket.user_id))
-
-    bal_row = db.session.execute(
-        text(
-            """
-            SELECT balance_pesos AS bal
-            FROM wallet_accounts
-            WHERE user_id = :uid
-        """
-        ),
-        {"uid": ticket.user_id},
-    ).mappings().first()
-    cur_bal = int(bal_row["bal"] or 0) if bal_row else 0
-    new_bal = cur_bal + amount_pesos
+    return _refund_paid_tickets([ticket], actor_id)[0]
 
+def _refund_paid_tickets(tickets: list[TicketSale], actor_id: int | None) -> list[dict]:
+    """
+    Refund paid tickets into their users' wallets, one summary per ticket (same order).
+    Three statements regardless of batch size: a create-or-credit upsert, one balance
+    read and one multi-row ledger INSERT.
+    """
+    if not _wallet_tables_exist():
+        return [{"refunded": False, "balance": None, "note": "wallet tables missing"} for _ in tickets]
+
+    summaries: list[dict | None] = [None] * len(tickets)
+    todo: list[tuple[int, TicketSale, int]] = []
+    for i, ticket in enumerate(tickets):
+        if not ticket.user_id:
+            summaries[i] = {"refunded": False, "balance": None, "note": "no user to refund"}
+            continue
+        amount_pesos = _amount_pesos_from_price(ticket.price)
+        if amount_pesos <= 0:
+            summaries[i] = {"refunded": False, "balance": None, "note": "zero-amount ticket"}
+            continue
+        todo.append((i, ticket, amount_pesos))
+
+    if not todo:
+        return summaries  # type: ignore[return-value]
+
+    credit: dict[int, int] = {}
+    for _, t, amt in todo:
+        credit[int(t.user_id)] = credit.get(int(t.user_id), 0) + amt
+    uids = sorted(credit)
+
+    # Create-or-credit in one statement per account (row-locked, no read-modify-write race)
     db.session.execute(
         text(
             """
-            UPDATE wallet_accounts
-            SET balance_pesos = :b
-            WHERE user_id = :uid
+            INSERT INTO wallet_accounts (user_id, balance_pesos)
+            VALUES (:uid, :amt)
+            ON DUPLICATE KEY UPDATE balance_pesos = balance_pesos + VALUES(balance_pesos)
         """
         ),
-        {"b": new_bal, "uid": ticket.user_id},
+        [{"uid": uid, "amt": credit[uid]} for uid in uids],
     )
+
+    # Final balances (our transaction holds the row locks, so these are ours)
+    balances = {
+        int(uid): int(bal or 0)
+        for uid, bal in db.session.execute(
+            text("SELECT user_id, balance_pesos FROM wallet_accounts WHERE user_id IN :uids").bindparams(
+                bindparam("uids", expanding=True)
+            ),
+            {"uids": uids},
+        ).all()
+    }
+
+    # Running balance per ledger row: start from the pre-refund balance, credit in ticket order
+    running = {uid: balances.get(uid, credit[uid]) - credit[uid] for uid in uids}
+    now = datetime.utcnow()
+    ledger_rows = []
+    for i, ticket, amount_pesos in todo:
+        uid = int(ticket.user_id)
+        running[uid] += amount_pesos
+        ledger_rows.append(
+            {"uid": uid, "amt": amount_pesos, "run": running[uid], "tid": ticket.id, "ts": now}
+        )
+        summaries[i] = {"refunded": True, "balance": running[uid], "note": None}
+
     db.session.execute(
         text(
             """
@@ -367,19 +801,174 @@ def _refund_paid_ticket(ticket: TicketSale, actor_id: int | None) -> dict:
             VALUES (:uid, 'in', 'refund_ticket', :amt, :run, 'ticket_sales', :tid, :ts)
         """
         ),
-        {
-            "uid": ticket.user_id,
-            "amt": amount_pesos,
-            "run": new_bal,
-            "tid": ticket.id,
-            "ts": datetime.utcnow(),
-        },
+        ledger_rows,
     )
-    return {"refunded": True, "balance": new_bal, "note": None}
+    return summaries  # type: ignore[return-value]
 
 # ─────────────────────────────────────────────
 # Wallet Top-up: Void (manager)
 # ─────────────────────────────────────────────
+def _topup_void_error(t: TopUp) -> str | None:
+    """Why this top-up cannot be voided (cash, succeeded, within the window), or None."""
+    if (t.status or "").lower() != "succeeded":
+        return "only succeeded top-ups can be voided"
+    if (t.method or "").lower() != "cash":
+        return "unsupported method for void: cash only"
+
+    created = getattr(t, "created_at", None)
+    if created:
+        # Epoch math: naive created_at is UTC; the window is a duration, so no tz conversion needed
+        created_epoch = (created if created.tzinfo else created.replace(tzinfo=timezone.utc)).timestamp()
+        if time.time() - created_epoch > _VOID_WINDOW_S:
+            return "void window elapsed (over 24 hours)"
+    return None
+
+def _reverse_topup(t: TopUp, amt: int) -> tuple[int | None, str | None]:
+    """
+    Cancel top-up `t` and debit `amt` from its wallet as two guarded UPDATEs, so concurrent
+    voids/spends can't both pass: the status must still be 'succeeded' and the balance must
+    still cover the amount. Returns (new_balance, None), or (None, error) — the caller then
+    rolls back (a status flip without its debit must not survive).
+    """
+    res = db.session.execute(
+        update(TopUp)
+        .where(TopUp.id == t.id, TopUp.status == "succeeded")
+        .values(status="cancelled")
+        .execution_options(synchronize_session=False)
+    )
+    if not res.rowcount:
+        return None, "only succeeded top-ups can be voided"
+    res = db.session.execute(
+        update(WalletAccount)
+        .where(WalletAccount.user_id == t.account_id, WalletAccount.balance_pesos >= amt)
+        .values(balance_pesos=WalletAccount.balance_pesos - amt)
+        .execution_options(synchronize_session=False)
+    )
+    if not res.rowcount:
+        return None, "insufficient wallet balance to reverse (funds already spent)"
+    # Our UPDATE holds the row lock, so this is the balance this debit produced
+    new_bal = int(
+        db.session.execute(
+            select(WalletAccount.balance_pesos).where(WalletAccount.user_id == t.account_id)
+        ).scalar() or 0
+    )
+    return new_bal, None
+
+def _notify_topup_void(uid: int, tid: int, amt: int, new_bal: int) -> None:
+    """Realtime wallet update + push for a reversed top-up (best-effort)."""
+    _publish_user_wallet(
+        uid,
+        new_balance_pesos=new_bal,
+        event="wallet_topup_void",
+        topup_id=tid,
+        method="cash",
+        amount_php=amt,
+    )
+    try:
+        push_to_user(
+            uid,
+            title="Top-up Reversed",
+            body=f"₱{amt} was reversed. New balance: ₱{new_bal}",
+            data={"type": "wallet_topup_void", "topup_id": tid},
+        )
+    except Exception:
+        current_app.logger.info("[push] void notify skipped/failed uid=%s", uid)
+
+# Small shared pool for post-commit notifications (MQTT + push) so requests don't wait on network I/O
+_notify_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="manager-notify")
+
+def _run_in_background(fn, *args) -> None:
+    """Run fn(*args) on the notification pool inside an app context (best-effort)."""
+    app = current_app._get_current_object()
+
+    def _job():
+        with app.app_context():
+            try:
+                fn(*args)
+            except Exception:
+                app.logger.exception("[manager] background job %s failed", getattr(fn, "__name__", fn))
+
+    _notify_pool.submit(_job)
+
+@manager_bp.route("/topups/bulk_void", methods=["POST"])
+@require_role("manager")
+def manager_bulk_void_topups():
+    """
+    Void several cash top-ups in one transaction.
+    Body: { "tids": [<int>, ...], "reason": "<optional text>" }
+    Returns: { voided: [{ topup_id, new_balance_php }], failed: [{ topup_id, error }] }
+    Each top-up follows the single-void rules; failures are reported, not fatal.
+    """
+    data = request.get_json(silent=True) or {}
+    reason = (data.get("reason") or "").strip()
+    try:
+        tids = sorted({int(x) for x in (data.get("tids") or [])})
+    except (TypeError, ValueError):
+        return jsonify(error="tids must be a list of integers"), 400
+    if not tids:
+        return jsonify(error="tids is required"), 400
+    if len(tids) > 500:
+        return jsonify(error="at most 500 top-ups per request"), 400
+
+    topups = {t.id: t for t in TopUp.query.filter(TopUp.id.in_(tids)).all()}
+
+    failed: list[dict] = []
+    done: list[tuple[TopUp, int, int]] = []  # (topup, amount, new balance)
+    ledger_rows: list[dict] = []
+
+    try:
+        for tid in tids:
+            t = topups.get(tid)
+            if not t:
+                failed.append({"topup_id": tid, "error": "top-up not found"})
+                continue
+            err = _topup_void_error(t)
+            if err:
+                failed.append({"topup_id": tid, "error": err})
+                continue
+            amt = _as_php(getattr(t, "amount_pesos", 0))
+            # One savepoint per top-up: a failed guard undoes just this one's status flip
+            sp = db.session.begin_nested()
+            new_bal, err = _reverse_topup(t, amt)
+            if err:
+                sp.rollback()
+                failed.append({"topup_id": tid, "error": err})
+                continue
+            sp.commit()
+            done.append((t, amt, new_bal))
+            ledger_rows.append(
+                {
+                    "account_id": t.account_id,
+                    "direction": "debit",
+                    "event": "topup_void",
+                    "amount_pesos": int(amt),
+                    "running_balance_pesos": int(new_bal),
+                    "ref_table": "wallet_topups",
+                    "ref_id": int(t.id),
+                }
+            )
+
+        if not done:
+            db.session.rollback()
+            return jsonify(voided=[], failed=failed), 200
+
+        db.session.execute(WalletLedger.__table__.insert(), ledger_rows)
+        db.session.commit()
+    except Exception as e:
+        current_app.logger.exception("[manager] bulk_void_topups failed")
+        db.session.rollback()
+        return jsonify(error=str(e)), 500
+
+    for t, amt, new_bal in done:
+        if reason:
+            _save_topup_void_reason(t.id, reason)
+        _run_in_background(_notify_topup_void, int(t.account_id), int(t.id), int(amt), int(new_bal))
+
+    return jsonify(
+        voided=[{"topup_id": int(t.id), "new_balance_php": int(nb)} for t, _, nb in done],
+        failed=failed,
+    ), 200
+
 @manager_bp.route("/topups/<int:tid>/void", methods=["POST"])
 @require_role("manager")
 def manager_void_topup(tid: int):
@@ -397,33 +986,17 @@ def manager_void_topup(tid: int):
     t = TopUp.query.get(tid)
     if not t:
         return jsonify(error="top-up not found"), 404
-    if (t.status or "").lower() != "succeeded":
-        return jsonify(error="only succeeded top-ups can be voided"), 400
-    if (t.method or "").lower() != "cash":
-        return jsonify(error="unsupported method for void: cash only"), 400
-
-    created = getattr(t, "created_at", None)
-    if created:
-        created_mnl = (created.astimezone(MNL_TZ) if created.tzinfo
-                       else created.replace(tzinfo=timezone.utc).astimezone(MNL_TZ))
-        age_hours = (datetime.now(MNL_TZ) - created_mnl).total_seconds() / 3600.0
-        if age_hours > VOID_WINDOW_HOURS:
-            return jsonify(error="void window elapsed (over 24 hours)"), 400
-
-    acct = WalletAccount.query.get(t.account_id)
-    if not acct:
-        acct = WalletAccount(user_id=t.account_id, balance_pesos=0)
-        db.session.add(acct)
-        db.session.flush()
+    err = _topup_void_error(t)
+    if err:
+        return jsonify(error=err), 400
 
     amt = _as_php(getattr(t, "amount_pesos", 0))
-    cur = _as_php(getattr(acct, "balance_pesos", 0))
-    if cur < amt:
-        return jsonify(error="insufficient wallet balance to reverse (funds already spent)"), 400
-
-    new_bal = cur - amt
     try:
-        acct.balance_pesos = int(new_bal)
+        new_bal, err = _reverse_topup(t, amt)
+        if err:
+            db.session.rollback()
+            return jsonify(error=err), 400
+
         led = WalletLedger(
             account_id=t.account_id,
             direction="debit",
@@ -434,29 +1007,12 @@ def manager_void_topup(tid: int):
             ref_id=int(t.id),
         )
         db.session.add(led)
-        t.status = "cancelled"
         if reason:
             _save_topup_void_reason(t.id, reason)
 
         db.session.commit()
 
-        _publish_user_wallet(
-            t.account_id,
-            new_balance_pesos=int(new_bal),
-            event="wallet_topup_void",
-            topup_id=int(t.id),
-            method="cash",
-            amount_php=int(amt),
-        )
-        try:
-            push_to_user(
-                t.account_id,
-                title="Top-up Reversed",
-                body=f"₱{amt} was reversed. New balance: ₱{new_bal}",
-                data={"type": "wallet_topup_void", "topup_id": int(t.id)},
-            )
-        except Exception:
-            current_app.logger.info("[push] void notify skipped/failed uid=%s", t.account_id)
+        _run_in_background(_notify_topup_void, int(t.account_id), int(t.id), int(amt), int(new_bal))
 
         return jsonify(
             ok=True,
@@ -487,7 +1043,14 @@ def manager_void_ticket(ticket_id: int):
     if want_void and not reason:
         return jsonify(error="reason is required when voiding a ticket"), 400
 
-    ticket = TicketSale.query.filter(TicketSale.id == ticket_id).first()
+    ticket = (
+        TicketSale.query.options(
+            load_only(TicketSale.id, TicketSale.user_id, TicketSale.price, TicketSale.paid, TicketSale.voided,
+                      TicketSale.created_at)  # _set_ticket_state invalidates the rollup day on void
+        )
+        .filter(TicketSale.id == ticket_id)
+        .first()
+    )
     if not ticket:
         return jsonify(error="ticket not found"), 404
 
@@ -555,20 +1118,13 @@ def manager_void_ticket(ticket_id: int):
     # Un-void (rare)
     try:
         with db.session.begin():
-            if table_has_column("ticket_sales", "voided"):
-                setattr(ticket, "voided", False)
-            if table_has_column("ticket_sales", "status"):
-                setattr(ticket, "status", "paid" if was_paid else "unpaid")
-            if table_has_column("ticket_sales", "paid"):
-                setattr(ticket, "paid", was_paid)
-            for col in ("void_reason", "reason", "note", "remarks"):
-                if table_has_column("ticket_sales", col):
-                    db.session.execute(
-                        text(f"UPDATE ticket_sales SET {col} = NULL WHERE id = :tid"),
-                        {"tid": ticket.id},
-                    )
-                    break
-            db.session.flush()
+            # One UPDATE for state + cleared reason
+            _set_ticket_state(
+                ticket,
+                {"voided": False, "status": ("paid" if was_paid else "unpaid"), "paid": was_paid},
+                None,
+                set_reason=True,
+            )
         return jsonify(
             ok=True,
             ticket_id=ticket.id,
@@ -584,6 +1140,73 @@ def manager_void_ticket(ticket_id: int):
         return jsonify(error=str(e)), 500
 
 
+@manager_bp.route("/tickets/bulk_void", methods=["POST"])
+@require_role("manager")
+def manager_void_tickets_bulk():
+    """
+    Void several tickets in one transaction (audit sweeps).
+    Body: { "ticket_ids": [<int>, ...], "reason": "<required>" }
+    Returns: { voided: [{ ticket_id, refund }], skipped: [{ ticket_id, note }] }
+    Wallet/GCash-paid tickets are refunded like the single void route.
+    """
+    data = request.get_json(silent=True) or {}
+    reason = (data.get("reason") or "").strip()
+    if not reason:
+        return jsonify(error="reason is required when voiding tickets"), 400
+    try:
+        ids = sorted({int(x) for x in (data.get("ticket_ids") or [])})
+    except (TypeError, ValueError):
+        return jsonify(error="ticket_ids must be a list of integers"), 400
+    if not ids:
+        return jsonify(error="ticket_ids is required"), 400
+    if len(ids) > 500:
+        return jsonify(error="at most 500 tickets per request"), 400
+
+    found = {t.id: t for t in TicketSale.query.filter(TicketSale.id.in_(ids)).all()}
+    skipped = [{"ticket_id": tid, "note": "ticket not found"} for tid in ids if tid not in found]
+
+    to_void: list[TicketSale] = []
+    to_refund: list[TicketSale] = []
+    notes: dict[int, dict] = {}
+    for tid in ids:
+        ticket = found.get(tid)
+        if ticket is None:
+            continue
+        if _is_ticket_void_row(ticket):
+            skipped.append({"ticket_id": tid, "note": "already voided"})
+            continue
+        to_void.append(ticket)
+        if not bool(getattr(ticket, "paid", False)):
+            continue
+        try:
+            method = _payment_method_for_ticket(ticket)
+        except Exception:
+            method = None
+        if method in {"wallet", "gcash"}:
+            to_refund.append(ticket)
+        elif method == "cash":
+            notes[tid] = {"refunded": False, "balance": None, "note": "cash payment: handle refund in cash"}
+
+    if not to_void:
+        return jsonify(voided=[], skipped=skipped), 200
+
+    try:
+        _mark_ticket_void(to_void, reason)
+        refunds = _refund_paid_tickets(to_refund, actor_id=getattr(g, "user", None) and g.user.id)
+        notes.update({t.id: r for t, r in zip(to_refund, refunds)})
+        db.session.commit()
+    except Exception as e:
+        current_app.logger.exception("[manager:bulk_void] failed")
+        db.session.rollback()
+        return jsonify(error=str(e)), 500
+
+    none = {"refunded": False, "balance": None, "note": None}
+    return jsonify(
+        voided=[{"ticket_id": t.id, "refund": notes.get(t.id, none)} for t in to_void],
+        skipped=skipped,
+    ), 200
+
+
 @manager_bp.route("/commuters", methods=["GET"])
 @require_role("manager")
 def list_commuters():
@@ -594,7 +1217,7 @@ def list_commuters():
     page_size = request.args.get("page_size", default=25, type=int) or 25
     page_size = min(max(page_size, 1), 100)
 
-    base = User.query.filter(User.role == "commuter")
+    conds = [User.role == "commuter"]
 
     if q:
         # 🔹 Split into words so "Juan Cruz" works:
@@ -603,7 +1226,7 @@ def list_commuters():
         terms = [part.strip() for part in q.split() if part.strip()]
         for term in terms:
             like = f"%{term}%"
-            base = base.filter(
+            conds.append(
                 or_(
                     User.first_name.ilike(like),
                     User.last_name.ilike(like),
@@ -612,57 +1235,66 @@ def list_commuters():
                 )
             )
 
-    total = base.count()
-
-    users = (
-        base.order_by(User.last_name.asc(), User.first_name.asc())
+    # One round-trip: the page (with the filtered total as a window column) plus
+    # per-user ticket stats as correlated lookups on ix_ticketsale_user_created.
+    with_total = _want_total()
+    order = (User.last_name.asc(), User.first_name.asc(), User.id.asc())
+    cols = [User.id, User.first_name, User.last_name, User.username, User.phone_number]
+    if with_total:
+        cols.append(func.count().over().label("total"))
+    pg = (
+        select(*cols)
+        .where(*conds)
+        .order_by(*order)
         .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
+        .limit(page_size if with_total else page_size + 1)  # +1 row tells has_next without a count
+        .subquery("pg")
     )
-
-    if users:
-        ids = [u.id for u in users]
-        stats_rows = (
-            db.session.query(
-                TicketSale.user_id.label("uid"),
-                func.count(TicketSale.id).label("tickets"),
-                func.max(TicketSale.created_at).label("last_ticket_at"),
-            )
-            .filter(TicketSale.user_id.in_(ids))
-            .group_by("uid")
-            .all()
-        )
-        stats = {
-            r.uid: {
-                "tickets": int(r.tickets or 0),
-                "last_ticket_at": (r.last_ticket_at.isoformat() if r.last_ticket_at else None),
-            }
-            for r in stats_rows
-        }
+    tickets = (
+        select(func.count(TicketSale.id))
+        .where(TicketSale.user_id == pg.c.id)
+        .scalar_subquery()
+    )
+    last_ticket_at = (
+        select(func.max(TicketSale.created_at))
+        .where(TicketSale.user_id == pg.c.id)
+        .scalar_subquery()
+    )
+    rows = db.session.execute(
+        select(pg, tickets.label("tickets"), last_ticket_at.label("last_ticket_at"))
+        .order_by(pg.c.last_name.asc(), pg.c.first_name.asc(), pg.c.id.asc())
+    ).all()
+
+    if not with_total:
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+    elif rows:
+        total = int(rows[0].total)
+    elif page > 1:
+        # Past the last page: no row carries the window total
+        total = db.session.execute(select(func.count(User.id)).where(*conds)).scalar() or 0
     else:
-        stats = {}
+        total = 0
 
-    items = []
-    for u in users:
-        s = stats.get(u.id, {"tickets": 0, "last_ticket_at": None})
-        items.append(
-            {
-                "id": u.id,
-                "first_name": u.first_name,
-                "last_name": u.last_name,
-                "name": f"{u.first_name} {u.last_name}".strip(),
-                "username": u.username,
-                "phone_number": u.phone_number,
-                "tickets": s["tickets"],
-                "last_ticket_at": s["last_ticket_at"],
-            }
-        )
+    items = [
+        {
+            "id": r.id,
+            "first_name": r.first_name,
+            "last_name": r.last_name,
+            "name": f"{r.first_name} {r.last_name}".strip(),
+            "username": r.username,
+            "phone_number": r.phone_number,
+            "tickets": int(r.tickets or 0),
+            "last_ticket_at": (r.last_ticket_at.isoformat() if r.last_ticket_at else None),
+        }
+        for r in rows
+    ]
 
+    if not with_total:
+        return _json_response({"items": items, "page": page, "page_size": page_size, "has_next": has_next})
     pages = (total + page_size - 1) // page_size
-    return (
-        jsonify({"items": items, "page": page, "page_size": page_size, "total": total, "pages": pages}),
-        200,
+    return _json_response(
+        {"items": items, "page": page, "page_size": page_size, "total": total, "pages": pages, "has_next": page < pages}
     )
 
 
@@ -738,8 +1370,8 @@ def commuter_tickets(user_id: int):
         page = request.args.get("page", type=int, default=1)
         size = min(max(request.args.get("page_size", type=int, default=25), 1), 100)
 
-        to_dt = datetime.strptime(to_str, "%Y-%m-%d") if to_str else datetime.utcnow()
-        fr_dt = datetime.strptime(from_str, "%Y-%m-%d") if from_str else (to_dt - timedelta(days=30))
+        to_dt = _parse_day_start(to_str) if to_str else datetime.utcnow()
+        fr_dt = _parse_day_start(from_str) if from_str else (to_dt - timedelta(days=30))
 
         O = aliased(TicketStop)
         D = aliased(TicketStop)
@@ -751,7 +1383,9 @@ def commuter_tickets(user_id: int):
         fields = [
             TicketSale.id,
             TicketSale.reference_no,
-            TicketSale.created_at,
+            # Formatted by MySQL: no per-row datetime objects / isoformat / strftime
+            func.date_format(TicketSale.created_at, _SQL_ISO_FMT).label("created_at_iso"),
+            func.date_format(TicketSale.created_at, _SQL_MINUTE_FMT).label("time_str"),
             TicketSale.price,
             TicketSale.passenger_type,
             (TicketSale.paid if has_paid else literal(False).label("paid")),
@@ -768,23 +1402,37 @@ def commuter_tickets(user_id: int):
             .outerjoin(O, TicketSale.origin_stop_time_id == O.id)
             .outerjoin(D, TicketSale.destination_stop_time_id == D.id)
             .filter(TicketSale.user_id == user_id)
-            .filter(TicketSale.created_at.between(fr_dt, to_dt + timedelta(days=1)))
+            .filter(TicketSale.created_at.between(fr_dt, to_dt + _DAY))
             .order_by(TicketSale.created_at.desc())
         )
 
-        total = base.count()
-        rows = base.offset((page - 1) * size).limit(size).all()
+        with_total = _want_total()
+        if with_total:
+            # Filtered total rides along as a window column: one join/scan for page + count
+            rows = (
+                base.add_columns(func.count().over().label("_total"))
+                .offset((page - 1) * size)
+                .limit(size)
+                .all()
+            )
+            if rows:
+                total = int(rows[0]._total)
+            else:
+                total = base.count() if page > 1 else 0
+        else:
+            rows = base.offset((page - 1) * size).limit(size + 1).all()
+            has_next = len(rows) > size
+            rows = rows[:size]
 
         items = []
         for r in rows:
-            st = (str(getattr(r, "status", "") or "")).lower()
-            is_void = bool(getattr(r, "voided", False)) or st in {"void", "voided", "refunded", "cancelled", "canceled"}
+            is_void = _is_ticket_void_row(r)
             items.append(
                 {
                     "id": r.id,
                     "referenceNo": getattr(r, "reference_no", None),
-                    "created_at": r.created_at.isoformat(),
-                    "time": r.created_at.strftime("%Y-%m-%d %H:%M"),
+                    "created_at": r.created_at_iso,
+                    "time": r.time_str,
                     "fare": f"{float(r.price or 0):.2f}",
                     "paid": bool(getattr(r, "paid", False)) and not is_void,
                     "status": (
@@ -799,19 +1447,59 @@ def commuter_tickets(user_id: int):
                 }
             )
 
-        return jsonify(
+        if not with_total:
+            return _json_response({"items": items, "page": page, "page_size": size, "has_next": has_next})
+        pages = (total + size - 1) // size
+        return _json_response(
             {
                 "items": items,
                 "page": page,
                 "page_size": size,
                 "total": total,
-                "pages": (total + size - 1) // size,
+                "pages": pages,
+                "has_next": page < pages,
             }
-        ), 200
+        )
     except Exception:
         current_app.logger.exception("ERROR in commuter_tickets")
         return jsonify(error="Failed to load tickets"), 500
 
+@lru_cache(maxsize=None)
+def _commuter_topups_sql(include_voided: bool, count_only: bool = False, with_total: bool = True):
+    """Compiled commuter top-up page (or count) SQL; the schema-dependent teller column is fixed per process."""
+    status_cond = "AND t.status IN ('succeeded','cancelled')" if include_voided else "AND t.status = 'succeeded'"
+    if count_only:
+        return text(f"""
+            SELECT COUNT(*)
+            FROM wallet_topups t
+            WHERE t.account_id = :uid
+              {status_cond}
+              AND t.created_at >= :fr
+              AND t.created_at <  :to_plus
+        """)
+
+    teller_col = _topups_teller_col()
+    return text(f"""
+        SELECT 
+            t.id,
+            DATE_FORMAT(t.created_at, '{_SQL_ISO_FMT}') AS created_at_iso,
+            t.amount_pesos,
+            COALESCE(t.method, 'cash') AS method,
+            t.status,
+            {teller_col} AS teller_id,
+            au.first_name AS teller_first,
+            au.last_name  AS teller_last
+            {", COUNT(*) OVER () AS total" if with_total else ""}
+        FROM wallet_topups t
+        LEFT JOIN users au ON au.id = {teller_col}
+        WHERE t.account_id = :uid
+          {status_cond}
+          AND t.created_at >= :fr
+          AND t.created_at <  :to_plus
+        ORDER BY t.created_at DESC
+        LIMIT :lim OFFSET :off
+    """)
+
 @manager_bp.route("/commuters/<int:user_id>/topups", methods=["GET"])
 @require_role("manager")
 def commuter_topups(user_id: int):
@@ -826,85 +1514,43 @@ def commuter_topups(user_id: int):
 
         include_voided = (request.args.get("include_voided", "false").strip().lower() in {"1", "true", "yes"})
 
-        to_dt = datetime.strptime(to_str, "%Y-%m-%d") if to_str else datetime.utcnow()
-        fr_dt = datetime.strptime(from_str, "%Y-%m-%d") if from_str else (to_dt - timedelta(days=30))
+        to_dt = _parse_day_start(to_str) if to_str else datetime.utcnow()
+        fr_dt = _parse_day_start(from_str) if from_str else (to_dt - timedelta(days=30))
 
         offset = (page - 1) * size
-
-        status_cond = "AND t.status IN ('succeeded','cancelled')" if include_voided else "AND t.status = 'succeeded'"
-
-        total_row = db.session.execute(
-            text(f"""
-                SELECT COUNT(*) AS c
-                FROM wallet_topups t
-                WHERE t.account_id = :uid
-                  {status_cond}
-                  AND t.created_at >= :fr
-                  AND t.created_at <  :to_plus
-            """),
-            {"uid": user_id, "fr": fr_dt, "to_plus": to_dt + timedelta(days=1)},
-        ).mappings().first() or {}
-        total = int(total_row.get("c", 0))
-
-        has_teller = table_has_column("wallet_topups", "teller_id")
-
-        if has_teller:
-            sql = f"""
-                SELECT 
-                    t.id,
-                    t.created_at,
-                    t.amount_pesos,
-                    COALESCE(t.method, 'cash') AS method,
-                    t.status,
-                    COALESCE(t.teller_id, t.pao_id) AS teller_id,
-                    COALESCE(tu.first_name, pu.first_name) AS teller_first,
-                    COALESCE(tu.last_name,  pu.last_name)  AS teller_last
-                FROM wallet_topups t
-                LEFT JOIN users tu ON tu.id = t.teller_id
-                LEFT JOIN users pu ON pu.id = t.pao_id
-                WHERE t.account_id = :uid
-                  {status_cond}
-                  AND t.created_at >= :fr
-                  AND t.created_at <  :to_plus
-                ORDER BY t.created_at DESC
-                LIMIT :lim OFFSET :off
-            """
-        else:
-            sql = f"""
-                SELECT 
-                    t.id,
-                    t.created_at,
-                    t.amount_pesos,
-                    COALESCE(t.method, 'cash') AS method,
-                    t.status,
-                    t.pao_id AS teller_id,
-                    pu.first_name AS teller_first,
-                    pu.last_name  AS teller_last
-                FROM wallet_topups t
-                LEFT JOIN users pu ON pu.id = t.pao_id
-                WHERE t.account_id = :uid
-                  {status_cond}
-                  AND t.created_at >= :fr
-                  AND t.created_at <  :to_plus
-                ORDER BY t.created_at DESC
-                LIMIT :lim OFFSET :off
-            """
+        with_total = _want_total()
 
         rows = db.session.execute(
-            text(sql),
+            _commuter_topups_sql(include_voided, with_total=with_total),
             {
                 "uid": user_id,
                 "fr": fr_dt,
-                "to_plus": to_dt + timedelta(days=1),
-                "lim": size,
+                "to_plus": to_dt + _DAY,
+                "lim": size if with_total else size + 1,  # +1 row tells has_next without a count
                 "off": offset,
             },
         ).mappings().all()
 
+        if not with_total:
+            has_next = len(rows) > size
+            rows = rows[:size]
+        elif rows:
+            total = int(rows[0]["total"])
+        elif page > 1:
+            # Past the last page: no row carries the window total
+            total = int(
+                db.session.execute(
+                    _commuter_topups_sql(include_voided, count_only=True),
+                    {"uid": user_id, "fr": fr_dt, "to_plus": to_dt + _DAY},
+                ).scalar() or 0
+            )
+        else:
+            total = 0
+
         items = [
             {
                 "id": r["id"],
-                "created_at": r["created_at"].isoformat() if r["created_at"] else None,
+                "created_at": r["created_at_iso"],
                 "amount_php": float(r["amount_pesos"] or 0.0),
                 "method": r["method"],
                 "status": r["status"],
@@ -914,11 +1560,11 @@ def commuter_topups(user_id: int):
             for r in rows
         ]
 
-        return (
-            jsonify(
-                {"items": items, "page": page, "page_size": size, "total": total, "pages": (total + size - 1) // size}
-            ),
-            200,
+        if not with_total:
+            return _json_response({"items": items, "page": page, "page_size": size, "has_next": has_next})
+        pages = (total + size - 1) // size
+        return _json_response(
+            {"items": items, "page": page, "page_size": size, "total": total, "pages": pages, "has_next": page < pages}
         )
 
     except Exception:
@@ -928,6 +1574,59 @@ def commuter_topups(user_id: int):
 # ─────────────────────────────────────────────
 # Manager Topups Summary
 # ─────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def _manager_topups_sql(include_voided: bool, by_method: bool, by_teller: bool, limited: bool):
+    """(aggregate, rows) compiled SQL for manager_topups, one pair per filter combination."""
+    teller_col = _topups_teller_col()
+    status_cond = "t.status IN ('succeeded','cancelled')" if include_voided else "t.status = 'succeeded'"
+
+    where_extra = []
+    if by_method:
+        where_extra.append("t.method = :m")
+    if by_teller:
+        where_extra.append(f"{teller_col} = :tid")
+    extra_sql = (" AND " + " AND ".join(where_extra)) if where_extra else ""
+
+    agg_sql = f"""
+        SELECT COUNT(*) AS cnt,
+               COALESCE(SUM(t.amount_pesos), 0) AS sum_php
+        FROM wallet_topups t
+        WHERE t.created_at BETWEEN :s AND :e
+          AND {status_cond}
+          {extra_sql}
+    """
+
+    base_sql = f"""
+        SELECT
+            t.id, t.account_id,
+            {teller_col} AS teller_id,
+            COALESCE(t.method, 'cash') AS method,
+            t.amount_pesos, t.status, t.created_at
+        FROM wallet_topups t
+        WHERE t.created_at BETWEEN :s AND :e
+          AND {status_cond}
+          {extra_sql}
+        ORDER BY t.id DESC
+    """
+    if limited:
+        base_sql += " LIMIT :lim"
+    return text(agg_sql), text(base_sql)
+
+_USER_IN_CHUNK = 1000
+
+def _user_names(user_ids) -> dict[int, str]:
+    """id → "First Last" for the given user ids (blank names omitted), in IN-list chunks."""
+    ids = sorted(u for u in user_ids if u is not None)
+    out: dict[int, str] = {}
+    for i in range(0, len(ids), _USER_IN_CHUNK):
+        for uid, first, last in db.session.execute(
+            select(User.id, User.first_name, User.last_name).where(User.id.in_(ids[i:i + _USER_IN_CHUNK]))
+        ):
+            name = f"{(first or '').strip()} {(last or '').strip()}".strip()
+            if name:
+                out[uid] = name
+    return out
+
 @manager_bp.route("/topups", methods=["GET"])
 @require_role("manager")
 def manager_topups():
@@ -939,12 +1638,12 @@ def manager_topups():
 
     try:
         if date_str:
-            day = _dt.strptime(date_str, "%Y-%m-%d").date()
+            day = _parse_iso_date(date_str)
             start_dt = _dt.combine(day, _dt.min.time())
             end_dt   = _dt.combine(day, _dt.max.time())
         elif start_str and end_str:
-            sd = _dt.strptime(start_str, "%Y-%m-%d").date()
-            ed = _dt.strptime(end_str,   "%Y-%m-%d").date()
+            sd = _parse_iso_date(start_str)
+            ed = _parse_iso_date(end_str)
             if ed < sd:
                 return jsonify(error="end must be >= start"), 400
             start_dt = _dt.combine(sd, _dt.min.time())
@@ -963,80 +1662,26 @@ def manager_topups():
     if limit is not None:
         limit = max(1, min(limit, 100))
 
-    has_teller = table_has_column("wallet_topups", "teller_id")
-    status_cond = "t.status IN ('succeeded','cancelled')" if include_voided else "t.status = 'succeeded'"
     params = {"s": start_dt, "e": end_dt}
-
-    where_extra = []
-    if method in ("cash", "gcash"):
-        where_extra.append("t.method = :m")
+    by_method = method in ("cash", "gcash")
+    if by_method:
         params["m"] = method
     if teller_id:
-        if has_teller:
-            where_extra.append("COALESCE(t.teller_id, t.pao_id) = :tid")
-        else:
-            where_extra.append("t.pao_id = :tid")
         params["tid"] = teller_id
+    if limit is not None:
+        params["lim"] = int(limit)
 
-    extra_sql = (" AND " + " AND ".join(where_extra)) if where_extra else ""
-
-    agg_sql = f"""
-        SELECT COUNT(*) AS cnt,
-               COALESCE(SUM(t.amount_pesos), 0) AS sum_php
-        FROM wallet_topups t
-        WHERE t.created_at BETWEEN :s AND :e
-          AND {status_cond}
-          {extra_sql}
-    """
-    agg = db.session.execute(text(agg_sql), params).mappings().first() or {"cnt": 0, "sum_php": 0}
+    agg_sql, base_sql = _manager_topups_sql(include_voided, by_method, bool(teller_id), limit is not None)
+    agg = db.session.execute(agg_sql, params).mappings().first() or {"cnt": 0, "sum_php": 0}
     count_all = int(agg["cnt"] or 0)
     total_all = float(agg["sum_php"] or 0.0)
 
-    if has_teller:
-        base_sql = f"""
-            SELECT
-                t.id, t.account_id,
-                COALESCE(t.teller_id, t.pao_id) AS teller_id,
-                COALESCE(t.method, 'cash')      AS method,
-                t.amount_pesos, t.status, t.created_at,
-                cu.first_name AS commuter_first, cu.last_name AS commuter_last,
-                au.first_name AS teller_first,   au.last_name AS teller_last
-            FROM wallet_topups t
-            LEFT JOIN users cu ON cu.id = t.account_id
-            LEFT JOIN users au ON au.id = COALESCE(t.teller_id, t.pao_id)
-            WHERE t.created_at BETWEEN :s AND :e
-              AND {status_cond}
-              {extra_sql}
-            ORDER BY t.id DESC
-        """
-    else:
-        base_sql = f"""
-            SELECT
-                t.id, t.account_id,
-                t.pao_id AS teller_id,
-                COALESCE(t.method, 'cash') AS method,
-                t.amount_pesos, t.status, t.created_at,
-                cu.first_name AS commuter_first, cu.last_name AS commuter_last,
-                au.first_name AS teller_first,   au.last_name AS teller_last
-            FROM wallet_topups t
-            LEFT JOIN users cu ON cu.id = t.account_id
-            LEFT JOIN users au ON au.id = t.pao_id
-            WHERE t.created_at BETWEEN :s AND :e
-              AND {status_cond}
-              {extra_sql}
-            ORDER BY t.id DESC
-        """
-
-    if limit is not None:
-        base_sql += " LIMIT :lim"
-        params["lim"] = int(limit)
-
-    rows = db.session.execute(text(base_sql), params).mappings().all()
+    # Unbounded date ranges can be large: stream from a server-side cursor in chunks of 500
+    # instead of buffering the whole result set before building items
+    rows = db.session.execute(base_sql.execution_options(yield_per=500), params).mappings()
 
     items = []
     for r in rows:
-        commuter_name = f"{(r['commuter_first'] or '').strip()} {(r['commuter_last'] or '').strip()}".strip() or None
-        teller_name   = f"{(r['teller_first']   or '').strip()} {(r['teller_last']   or '').strip()}".strip() or None
         items.append(
             {
                 "id": int(r["id"]),
@@ -1045,13 +1690,19 @@ def manager_topups():
                 "method": r["method"] or "cash",
                 "status": r["status"],
                 "commuter_id": int(r["account_id"]) if r["account_id"] is not None else None,
-                "commuter_name": commuter_name,
+                "commuter_name": None,
                 "teller_id": int(r["teller_id"]) if r["teller_id"] is not None else None,
-                "teller_name": teller_name,
+                "teller_name": None,
             }
         )
 
-    return jsonify(items=items, count=count_all, total_php=total_all), 200
+    # Names for the distinct commuters/tellers only, instead of two joined name pairs per row
+    names = _user_names({it["commuter_id"] for it in items} | {it["teller_id"] for it in items})
+    for it in items:
+        it["commuter_name"] = names.get(it["commuter_id"])
+        it["teller_name"] = names.get(it["teller_id"])
+
+    return _json_response({"items": items, "count": count_all, "total_php": total_all})
 
 @manager_bp.route("/paos", methods=["GET"])
 @require_role("manager", "pao")  # allow PAO & Manager to call
@@ -1075,6 +1726,7 @@ def list_paos():
 
 @manager_bp.route("/revenue-breakdown", methods=["GET"])
 @require_role("manager")
+@_cached_report
 def revenue_breakdown():
     from datetime import datetime as _dt, timedelta as _td
 
@@ -1097,7 +1749,7 @@ def revenue_breakdown():
         if not (date_str and bus_id):
             return jsonify(error="trip_id OR (date, bus_id, from, to) required"), 400
         try:
-            day = _dt.strptime(date_str, "%Y-%m-%d").date()
+            day = _parse_iso_date(date_str)
         except ValueError:
             return jsonify(error="invalid date format"), 400
         try:
@@ -1105,54 +1757,54 @@ def revenue_breakdown():
             hhmm_to = request.args["to"]
         except KeyError:
             return jsonify(error="from and to are required"), 400
-        window_from = _dt.combine(day, _dt.strptime(hhmm_from, "%H:%M").time())
-        window_to = _dt.combine(day, _dt.strptime(hhmm_to, "%H:%M").time())
+        window_from = _dt.combine(day, _parse_hhmm(hhmm_from))
+        window_to = _dt.combine(day, _parse_hhmm(hhmm_to))
         if window_to <= window_from:
             window_to = window_to + _td(days=1)
 
-    qs = db.session.query(
-        TicketSale.passenger_type,
-        func.count(TicketSale.id).label("tickets"),
-        func.coalesce(func.sum(TicketSale.price), 0.0).label("revenue"),
-    ).filter(
+    # Per-type counts plus grand totals and shares via window aggregates: Python only formats
+    tickets = func.count(TicketSale.id)
+    revenue = func.coalesce(func.sum(TicketSale.price), 0)
+    all_tickets = func.sum(tickets).over()
+    all_revenue = func.sum(revenue).over()
+    conds = [
         TicketSale.bus_id == bus_id,
         TicketSale.created_at >= window_from,
         TicketSale.created_at <= window_to,
-    )
+    ]
     if paid_only:
-        qs = qs.filter(TicketSale.paid.is_(True))
-    rows = qs.group_by(TicketSale.passenger_type).all()
+        conds.append(TicketSale.paid.is_(True))
+    rows = db.session.execute(
+        select(
+            TicketSale.passenger_type,
+            tickets,
+            revenue,
+            all_tickets,
+            all_revenue,
+            func.coalesce(100.0 * tickets / func.nullif(all_tickets, 0), 0),
+            func.coalesce(100.0 * revenue / func.nullif(all_revenue, 0), 0),
+        )
+        .where(*conds)
+        .group_by(TicketSale.passenger_type)
+    ).all()
 
-    totals_tickets = 0
-    totals_revenue = 0.0
-    by_type = []
-    for r in rows:
-        ttype = (r.passenger_type or "regular").lower()
-        tickets = int(r.tickets or 0)
-        revenue = float(r.revenue or 0.0)
-        by_type.append({"type": ttype, "tickets": tickets, "revenue": revenue})
-        totals_tickets += tickets
-        totals_revenue += revenue
-
-    types = {g["type"] for g in by_type}
-    if "regular" not in types:
-        by_type.append({"type": "regular", "tickets": 0, "revenue": 0.0})
-    if "discount" not in types:
-        by_type.append({"type": "discount", "tickets": 0, "revenue": 0.0})
+    totals_tickets = int(rows[0][3] or 0) if rows else 0
+    totals_revenue = float(rows[0][4] or 0.0) if rows else 0.0
+    out = [
+        {
+            "type": (ttype or "regular").lower(),
+            "tickets": int(n or 0),
+            "revenue": round(float(rev or 0.0), 2),
+            "pct_tickets": round(float(pct_t), 1),
+            "pct_revenue": round(float(pct_r), 1),
+        }
+        for ttype, n, rev, _, _, pct_t, pct_r in rows
+    ]
 
-    out = []
-    for g in by_type:
-        pct_t = (g["tickets"] / totals_tickets * 100.0) if totals_tickets else 0.0
-        pct_r = (g["revenue"] / totals_revenue * 100.0) if totals_revenue else 0.0
-        out.append(
-            {
-                "type": g["type"],
-                "tickets": g["tickets"],
-                "revenue": round(g["revenue"], 2),
-                "pct_tickets": round(pct_t, 1),
-                "pct_revenue": round(pct_r, 1),
-            }
-        )
+    types = {g["type"] for g in out}
+    for missing in ("regular", "discount"):
+        if missing not in types:
+            out.append({"type": missing, "tickets": 0, "revenue": 0.0, "pct_tickets": 0.0, "pct_revenue": 0.0})
 
     return (
         jsonify(
@@ -1167,57 +1819,104 @@ def revenue_breakdown():
         200,
     )
 
+
+def _ticket_rollup_days(date_from: date, date_to: date) -> set:
+    """Days in [date_from, date_to] with a complete ticket_sale_daily rollup (empty when missing)."""
+    try:
+        return set(db.session.execute(
+            select(TicketSaleDailyDay.day).where(TicketSaleDailyDay.day.between(date_from, date_to))
+        ).scalars())
+    except Exception:
+        db.session.rollback()
+        return set()
+
+def _uncovered_runs(date_from: date, date_to: date, covered: set) -> list[tuple[datetime, datetime]]:
+    """Maximal runs of days in [date_from, date_to] not in `covered`, as [start, end) datetimes."""
+    runs, start, d = [], None, date_from
+    while d <= date_to + _DAY:
+        gap = d <= date_to and d not in covered
+        if gap and start is None:
+            start = d
+        elif not gap and start is not None:
+            runs.append((datetime.combine(start, dtime.min), datetime.combine(d, dtime.min)))
+            start = None
+        d += _DAY
+    return runs
+
 @manager_bp.route("/metrics/tickets", methods=["GET"])
 @require_role("manager")
+@_cached_report
 def ticket_metrics():
     today = datetime.utcnow().date()
-    date_to = datetime.strptime(request.args.get("to", today.isoformat()), "%Y-%m-%d").date()
-    date_from = datetime.strptime(
-        request.args.get("from", (date_to - timedelta(days=6)).isoformat()),
-        "%Y-%m-%d",
-    ).date()
-
-    window_start = datetime.combine(date_from, datetime.min.time())
-    window_end = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+    date_to = _parse_iso_date(request.args.get("to", today.isoformat()).strip())
+    date_from = _parse_iso_date(request.args.get("from", (date_to - timedelta(days=6)).isoformat()).strip())
 
     bus_id = request.args.get("bus_id", type=int)
 
+    # Dashboards poll this endpoint: answer repeats with 304 while nothing new was sold.
+    # The time bucket bounds staleness for edits that don't add rows (e.g. voids).
+    last_ticket_id = db.session.query(func.max(TicketSale.id)).scalar() or 0
+    etag = hashlib.md5(
+        f"{date_from}|{date_to}|{bus_id}|{last_ticket_id}|{int(time.time() // _METRICS_MAX_AGE_S)}".encode()
+    ).hexdigest()
+    if request.if_none_match.contains(etag):
+        resp = current_app.response_class(status=304)
+        resp.set_etag(etag)
+        return resp
+
     # 🔹 NEW: detect schema
     has_voided = table_has_column("ticket_sales", "voided")
     has_status = table_has_column("ticket_sales", "status")
 
-    qs = db.session.query(
-        func.date_format(TicketSale.created_at, "%Y-%m-%d").label("d"),
-        func.count(TicketSale.id).label("tickets"),
-        func.sum(TicketSale.price).label("revenue"),
-    ).filter(
-        TicketSale.created_at >= window_start,
-        TicketSale.created_at < window_end,
-    )
-
-    if bus_id:
-        qs = qs.filter(TicketSale.bus_id == bus_id)
-
-    # 🔹 NEW: exclude voided / refunded / cancelled tickets
-    if has_voided:
-        qs = qs.filter(TicketSale.voided.is_(False))
-    elif has_status:
-        voided_states = ("void", "voided", "refunded", "cancelled", "canceled")
-        qs = qs.filter(
-            ~func.lower(func.coalesce(TicketSale.status, "")).in_(voided_states)
-        )
-
-    rows = qs.group_by("d").order_by("d").all()
+    # Statements are lambda_stmt()s: after the first request each variant (bus filter,
+    # void schema) is a cache hit keyed on the lambdas' code, so nothing is rebuilt or
+    # recompiled; dates/ids in the closures become bound parameters.
+    # Days the rollup covers come from ticket_sale_daily (O(days)); every other day — before
+    # the first rollup, invalidated by a void, or today — is aggregated live, one range per run.
+    rows = []
+    covered = _ticket_rollup_days(date_from, date_to) if has_voided else set()
+    if covered:
+        hist = lambda_stmt(lambda: select(
+            TicketSaleDaily.day,
+            func.sum(TicketSaleDaily.tickets),
+            func.coalesce(func.sum(TicketSaleDaily.revenue), 0),
+        ).where(TicketSaleDaily.day >= date_from, TicketSaleDaily.day <= date_to))
+        if bus_id:
+            hist += lambda s: s.where(TicketSaleDaily.bus_id == bus_id)
+        hist += lambda s: s.group_by(TicketSaleDaily.day)
+        rows.extend(db.session.execute(hist).all())
+
+    for live_from, live_to in _uncovered_runs(date_from, date_to, covered):
+        live = lambda_stmt(lambda: select(
+            func.date(TicketSale.created_at, type_=Date),  # date objects on every driver, like the rollup rows
+            func.count(TicketSale.id),
+            func.coalesce(func.sum(TicketSale.price), 0),
+        ).where(TicketSale.created_at >= live_from, TicketSale.created_at < live_to))
+        if bus_id:
+            live += lambda s: s.where(TicketSale.bus_id == bus_id)
+
+        # 🔹 NEW: exclude voided / refunded / cancelled tickets
+        if has_voided:
+            live += lambda s: s.where(TicketSale.voided.is_(False))
+        elif has_status:
+            live += lambda s: s.where(
+                ~func.lower(func.coalesce(TicketSale.status, "")).in_(_VOID_STATUSES_SQL)
+            )
 
-    daily = []
-    total_tickets = 0
-    total_revenue = 0.0
-    for r in rows:
-        daily.append({"date": r.d, "tickets": int(r.tickets), "revenue": float(r.revenue or 0)})
-        total_tickets += int(r.tickets)
-        total_revenue += float(r.revenue or 0)
+        live += lambda s: s.group_by(func.date(TicketSale.created_at))
+        rows.extend(db.session.execute(live).all())
+    rows.sort(key=lambda r: r[0])
+    daily = [{"date": d.isoformat(), "tickets": int(t), "revenue": float(rev)} for d, t, rev in rows]
 
-    return jsonify(daily=daily, total_tickets=total_tickets, total_revenue=round(total_revenue, 2)), 200
+    resp = jsonify(
+        daily=daily,
+        total_tickets=sum(p["tickets"] for p in daily),
+        total_revenue=round(sum(p["revenue"] for p in daily), 2),
+    )
+    resp.set_etag(etag)
+    resp.cache_control.private = True
+    resp.cache_control.max_age = _METRICS_MAX_AGE_S
+    return resp, 200
 
 
 # ─────────────────────────────────────────────
@@ -1340,7 +2039,7 @@ def _load_daily_ticket_series(
         if has_voided:
             qs = qs.filter(TicketSale.voided.is_(False))
         elif has_status:
-            voided_states = ("void", "voided", "refunded", "cancelled", "canceled")
+            voided_states = _VOID_STATUSES_SQL
             qs = qs.filter(~func.lower(func.coalesce(TicketSale.status, "")).in_(voided_states))
 
     rows = qs.group_by(day_expr).order_by(day_expr).all()
@@ -1390,7 +2089,7 @@ def _linear_slope_last_k(y: list[float], k: int) -> float:
 def _weekday_avgs(history_pts: list[dict]) -> dict[int, float]:
     buckets: dict[int, list[float]] = {i: [] for i in range(7)}
     for p in history_pts:
-        d = datetime.strptime(p["date"], "%Y-%m-%d").date()
+        d = _parse_iso_date(p["date"])
         buckets[d.weekday()].append(float(p["value"]))
     avgs: dict[int, float] = {}
     for wd, vals in buckets.items():
@@ -1420,7 +2119,7 @@ def _forecast_from_history(*, history_pts: list[dict], horizon_days: int) -> tup
     sigma_delta = _stddev(deltas) if deltas else _stddev(y)
     sigma_delta = max(sigma_delta, 0.05 * (overall_avg or 1.0))
 
-    last_day = datetime.strptime(history_pts[-1]["date"], "%Y-%m-%d").date()
+    last_day = _parse_iso_date(history_pts[-1]["date"])
     last_val = y[-1]
 
     preds: list[dict] = []
@@ -1494,7 +2193,7 @@ def tickets_forecast():
     to_str = (request.args.get("to") or "").strip()
     try:
         if to_str:
-            day_to = datetime.strptime(to_str, "%Y-%m-%d").date()
+            day_to = _parse_iso_date(to_str)
         else:
             day_to = (datetime.now(MNL_TZ).date() if tz == "mnl" else datetime.utcnow().date())
     except ValueError:
@@ -1552,27 +2251,39 @@ def tickets_forecast():
 # ─────────────────────────────────────────────
 @manager_bp.route("/buses", methods=["GET"])
 @require_role("manager", "pao")
+@_cached_get(_BUSES_TTL_S)
 def list_buses():
     try:
-        out = []
-        buses = Bus.query.order_by(Bus.identifier).all()
-        for b in buses:
-            latest = (
-                SensorReading.query.filter_by(bus_id=b.id)
-                .order_by(SensorReading.timestamp.desc())
-                .first()
-            )
-            out.append(
-                {
-                    "id": b.id,
-                    "identifier": b.identifier,
-                    "capacity": b.capacity,
-                    "description": b.description,
-                    "last_seen": latest.timestamp.isoformat() if latest else None,
-                    "occupancy": latest.total_count if latest else None,
-                }
+        # Buses + latest reading in one statement: per bus, two correlated LIMIT 1 lookups of its
+        # newest reading, each a backward seek on the covering (bus_id, timestamp, id, …counts) index.
+        # One row per bus by construction; id breaks timestamp ties so both lookups pick the same reading.
+        def _newest(col):
+            return (
+                select(col)
+                .where(SensorReading.bus_id == Bus.id)
+                .order_by(SensorReading.timestamp.desc(), SensorReading.id.desc())
+                .limit(1)
+                .scalar_subquery()
             )
-        return jsonify(out), 200
+
+        rows = db.session.execute(
+            select(
+                Bus.id, Bus.identifier, Bus.capacity, Bus.description,
+                _newest(SensorReading.timestamp), _newest(SensorReading.total_count),
+            ).order_by(Bus.identifier)
+        ).all()
+
+        return _json_response([
+            {
+                "id": bid,
+                "identifier": identifier,
+                "capacity": capacity,
+                "description": description,
+                "last_seen": ts.isoformat() if ts else None,
+                "occupancy": total,
+            }
+            for bid, identifier, capacity, description, ts, total in rows
+        ])
     except Exception:
         current_app.logger.exception("ERROR in /manager/buses")
         return jsonify(error="Could not process the request to list buses."), 500
@@ -1580,17 +2291,29 @@ def list_buses():
 @manager_bp.route("/buses/<int:bus_id>", methods=["PATCH"])
 @require_role("manager")
 def update_bus(bus_id):
-    bus = Bus.query.get_or_404(bus_id)
     data = request.get_json() or {}
 
+    values = {}
     if "identifier" in data:
-        bus.identifier = data["identifier"].strip()
+        values["identifier"] = data["identifier"].strip()
     if "capacity" in data:
-        bus.capacity = data["capacity"]
+        values["capacity"] = data["capacity"]
     if "description" in data:
-        bus.description = data["description"].strip()
+        values["description"] = data["description"].strip()
+
+    if not values:
+        if db.session.get(Bus, bus_id) is None:
+            return jsonify(error="bus not found"), 404
+        return jsonify(success=True), 200
 
+    # Single UPDATE of just the sent columns; matched rowcount doubles as the existence check
+    res = db.session.execute(update(Bus).where(Bus.id == bus_id).values(**values))
+    if res.rowcount == 0:
+        db.session.rollback()
+        return jsonify(error="bus not found"), 404
     db.session.commit()
+    _invalidate_bus_ids()  # identifier may have changed
+    _clear_report_cache()
     return jsonify(success=True), 200
 
 
@@ -1627,29 +2350,29 @@ def list_bus_trips():
         return jsonify(error="date and bus_id are required"), 400
 
     try:
-        day = datetime.strptime(date_str, "%Y-%m-%d").date()
+        day = _parse_iso_date(date_str)
     except ValueError:
         return jsonify(error="invalid date format"), 400
 
-    trips = (
-        Trip.query.filter(Trip.bus_id == bus_id, Trip.service_date == day)
+    trips = db.session.execute(
+        select(Trip.id, Trip.number, Trip.start_time, Trip.end_time)
+        .where(Trip.bus_id == bus_id, Trip.service_date == day)
         .order_by(Trip.start_time.asc())
-        .all()
-    )
+    ).all()
 
     trips_payload = [
         {
-            "id": t.id,
-            "number": t.number,
-            "start_time": t.start_time.strftime("%H:%M"),
-            "end_time": t.end_time.strftime("%H:%M"),
+            "id": tid,
+            "number": number,
+            "start_time": fmt_hhmm(start),
+            "end_time": fmt_hhmm(end),
         }
-        for t in trips
+        for tid, number, start, end in trips
     ]
 
     # Back-compat: older clients expect a plain array unless assignments explicitly requested
     if not include_assignments:
-        return jsonify(trips_payload), 200
+        return _json_response(trips_payload)
 
     # Include PAO & Driver assignment for this bus/date
     # Add username to the select and fall back to it when first/last are blank.
@@ -1710,9 +2433,9 @@ def create_trip():
         return jsonify(error=f"Missing field(s): {', '.join(missing)}"), 400
 
     try:
-        service_date = datetime.strptime(str(data["service_date"]), "%Y-%m-%d").date()
-        start_time = datetime.strptime(str(data["start_time"]), "%H:%M").time()
-        end_time = datetime.strptime(str(data["end_time"]), "%H:%M").time()
+        service_date = _parse_iso_date(str(data["service_date"]))
+        start_time = _parse_hhmm(str(data["start_time"]))
+        end_time = _parse_hhmm(str(data["end_time"]))
     except ValueError:
         return jsonify(error="Invalid date/time format"), 400
 
@@ -1726,19 +2449,28 @@ def create_trip():
     if end_time <= start_time:
         return jsonify(error="end_time must be after start_time"), 400
 
-    existing = Trip.query.filter(Trip.bus_id == bus_id, Trip.service_date == service_date).all()
-
-    ns = datetime.combine(service_date, start_time)
-    ne = datetime.combine(service_date, end_time)
-
-    for t in existing:
-        s = datetime.combine(service_date, t.start_time)
-        e = datetime.combine(service_date, t.end_time)
-        if max(s, ns) < min(e, ne):  # overlap
-            return (
-                jsonify(error=f"Overlaps with {t.number} ({t.start_time.strftime('%H:%M')}–{t.end_time.strftime('%H:%M')})"),
-                409,
-            )
+    # Interval overlap (s1 < e2 AND e1 > s2), served by ix_trip_bus_date_start.
+    # FOR UPDATE next-key-locks the scanned (bus, day, start < end) range until commit, so a
+    # concurrent create for the same slot waits instead of slipping past the check
+    # (MySQL has no exclusion constraints).
+    conflict = db.session.execute(
+        select(Trip.number, Trip.start_time, Trip.end_time)
+        .where(
+            Trip.bus_id == bus_id,
+            Trip.service_date == service_date,
+            Trip.start_time < end_time,
+            Trip.end_time > start_time,
+        )
+        .limit(1)
+        .with_for_update()
+    ).first()
+    if conflict:
+        db.session.rollback()
+        c_number, c_start, c_end = conflict
+        return (
+            jsonify(error=f"Overlaps with {c_number} ({fmt_hhmm(c_start)}–{fmt_hhmm(c_end)})"),
+            409,
+        )
 
     trip = Trip(bus_id=bus_id, service_date=service_date, number=number, start_time=start_time, end_time=end_time)
 
@@ -1751,7 +2483,7 @@ def create_trip():
         return jsonify(error="Failed to create trip"), 500
 
     return (
-        jsonify(id=trip.id, number=trip.number, start_time=trip.start_time.strftime("%H:%M"), end_time=trip.end_time.strftime("%H:%M")),
+        jsonify(id=trip.id, number=trip.number, start_time=fmt_hhmm(trip.start_time), end_time=fmt_hhmm(trip.end_time)),
         201,
     )
 
@@ -1761,22 +2493,29 @@ def update_trip(trip_id: int):
     data = request.get_json() or {}
     try:
         number = data.get("number", "").strip()
-        start_time = datetime.strptime(data["start_time"], "%H:%M").time()
-        end_time = datetime.strptime(data["end_time"], "%H:%M").time()
+        start_time = _parse_hhmm(str(data["start_time"]))
+        end_time = _parse_hhmm(str(data["end_time"]))
     except (KeyError, ValueError):
         return jsonify(error="Invalid payload or missing required fields"), 400
 
     if end_time <= start_time:
         return jsonify(error="end_time must be after start_time"), 400
 
-    trip = Trip.query.get_or_404(trip_id)
-    trip.number = number or trip.number
-    trip.start_time = start_time
-    trip.end_time = end_time
+    # One UPDATE, no pre-SELECT; rowcount is rows matched (the MySQL dialect sets FOUND_ROWS)
+    values = {"start_time": start_time, "end_time": end_time}
+    if number:
+        values["number"] = number
+    res = db.session.execute(
+        update(Trip).where(Trip.id == trip_id).values(**values).execution_options(synchronize_session=False)
+    )
+    if res.rowcount == 0:
+        return jsonify(error="Trip not found"), 404
+    if not number:
+        number = db.session.execute(select(Trip.number).where(Trip.id == trip_id)).scalar()
 
     db.session.commit()
 
-    return jsonify(id=trip.id, number=trip.number, start_time=trip.start_time.strftime("%H:%M"), end_time=trip.end_time.strftime("%H:%M")), 200
+    return jsonify(id=trip_id, number=number, start_time=fmt_hhmm(start_time), end_time=fmt_hhmm(end_time)), 200
 
 @manager_bp.route("/trips/<int:trip_id>", methods=["DELETE"])
 @require_role("manager")
@@ -1784,7 +2523,6 @@ def delete_trip(trip_id: int):
     try:
         rows = Trip.query.filter_by(id=trip_id).delete(synchronize_session=False)
         if rows == 0:
-            db.session.rollback()
             return jsonify(error="Trip not found"), 404
 
         db.session.commit()
@@ -1798,35 +2536,32 @@ def delete_trip(trip_id: int):
 # ─────────────────────────────────────────────
 @manager_bp.route("/tickets/composition", methods=["GET"])
 @require_role("manager")
+@_cached_report
 def tickets_composition():
     try:
-        day = datetime.strptime(
-            request.args.get("date") or datetime.utcnow().date().isoformat(),
-            "%Y-%m-%d",
-        ).date()
+        day = _parse_iso_date(request.args.get("date") or datetime.utcnow().date().isoformat())
     except ValueError:
         return jsonify(error="invalid date"), 400
 
-    ptype = func.coalesce(TicketSale.passenger_type, "regular")
+    ptype = func.lower(func.coalesce(TicketSale.passenger_type, "regular"))
     has_voided = table_has_column("ticket_sales", "voided")
     has_status = table_has_column("ticket_sales", "status")
 
-    qs = db.session.query(ptype.label("ptype"), func.count(TicketSale.id)).filter(func.date(TicketSale.created_at) == day)
+    # One row of conditional counts; created_at range (not DATE()) so the index applies
+    start = datetime.combine(day, datetime.min.time())
+    conds = [TicketSale.created_at >= start, TicketSale.created_at < start + _DAY]
     if has_voided:
-        qs = qs.filter(TicketSale.voided.is_(False))
+        conds.append(TicketSale.voided.is_(False))
     elif has_status:
-        qs = qs.filter(func.lower(func.coalesce(TicketSale.status, "")) != "voided")
-
-    rows = qs.group_by("ptype").all()
+        conds.append(func.lower(func.coalesce(TicketSale.status, "")) != "voided")
 
-    regular = 0
-    discount = 0
-    for t, cnt in rows:
-        t = (t or "").lower()
-        if t == "regular":
-            regular = int(cnt or 0)
-        elif t == "discount":
-            discount = int(cnt or 0)
+    regular, discount = db.session.execute(
+        select(
+            func.coalesce(func.sum(case((ptype == "regular", 1), else_=0)), 0),
+            func.coalesce(func.sum(case((ptype == "discount", 1), else_=0)), 0),
+        ).where(*conds)
+    ).one()
+    regular, discount = int(regular), int(discount)
 
     return jsonify(regular=regular, discount=discount, total=regular + discount), 200
 
@@ -1840,12 +2575,10 @@ def tickets_for_day():
         - bus_id=<int>
         - include_voided=true|false
         - array=1|0
+        - ts=iso|ms   (ms → created_at_ms epoch ints instead of created_at/time strings)
     """
     try:
-        day = datetime.strptime(
-            request.args.get("date") or datetime.now(MNL_TZ).date().isoformat(),
-            "%Y-%m-%d",
-        ).date()
+        day = _parse_iso_date(request.args.get("date") or datetime.now(MNL_TZ).date().isoformat())
     except ValueError:
         return jsonify(error="invalid date"), 400
 
@@ -1857,11 +2590,7 @@ def tickets_for_day():
     has_voided = table_has_column("ticket_sales", "voided")
     has_paid   = table_has_column("ticket_sales", "paid")
 
-    reason_label = None
-    for col in ("void_reason", "reason", "note", "remarks"):
-        if table_has_column("ticket_sales", col):
-            reason_label = getattr(TicketSale, col).label("void_reason")
-            break
+    reason_col = _void_reason_col("ticket_sales")
 
     O = aliased(TicketStop)
     D = aliased(TicketStop)
@@ -1880,9 +2609,23 @@ def tickets_for_day():
         (TicketSale.paid   if has_paid   else literal(False).label("paid")),
         (TicketSale.voided if has_voided else literal(False).label("voided")),
         (TicketSale.status if has_status else literal(None).label("status")),
+        (getattr(TicketSale, reason_col) if reason_col else literal(None)).label("void_reason"),
     ]
-    if reason_label is not None:
-        fields.append(reason_label)
+
+    # Object form reports paid, non-voided revenue: summed by the DB over the same scan
+    # (window total on every row) instead of accumulated per row in Python
+    if want_array or not has_paid:
+        fields.append(literal(None).label("paid_total"))
+    else:
+        is_void = []
+        if has_voided:
+            is_void.append(TicketSale.voided.is_(True))
+        if has_status:
+            is_void.append(func.lower(func.trim(func.coalesce(TicketSale.status, ""))).in_(_VOID_STATUSES_SQL))
+        counted = TicketSale.paid.is_(True)
+        if is_void:
+            counted = counted & ~or_(*is_void)
+        fields.append(func.sum(case((counted, TicketSale.price), else_=0)).over().label("paid_total"))
 
     start_mnl = datetime.combine(day, datetime.min.time(), tzinfo=MNL_TZ)
     end_mnl   = start_mnl + timedelta(days=1)
@@ -1906,68 +2649,61 @@ def tickets_for_day():
         elif has_status:
             qs = qs.filter(func.lower(func.coalesce(TicketSale.status, "")) != "voided")
 
-    rows = qs.order_by(TicketSale.created_at.desc()).all()
-
-    def _fmt_price(p) -> str:
-        try:
-            return f"{float(p or 0):.2f}"
-        except Exception:
-            return "0.00"
-
-    def _is_voided(row) -> bool:
-        st = (str(getattr(row, "status", "") or "")).lower()
-        return bool(getattr(row, "voided", False)) or st in {"void", "voided", "refunded", "cancelled", "canceled"}
-
-    items = []
-    revenue_ex_voided_paid = 0.0
-
-    for r in rows:
-        full_name = ("{} {}".format((r.first_name or "").strip(), (r.last_name or "").strip()).strip() or None)
-        is_guest = not bool(full_name)
-        commuter_display = full_name or "Guest"
-        is_void = _is_voided(r)
-        fare_str = _fmt_price(r.price)
-
-        if (bool(getattr(r, "paid", False)) and not is_void):
-            try:
-                revenue_ex_voided_paid += float(fare_str)
-            except Exception:
-                pass
-
-        items.append(
-            {
-                "id": r.id,
-                "referenceNo": getattr(r, "reference_no", None),
-                "created_at": r.created_at.isoformat() if r.created_at else None,
-                "time": r.created_at.strftime("%Y-%m-%d %H:%M") if r.created_at else None,
-                "fare": fare_str,
-                "paid": bool(getattr(r, "paid", False)) and not is_void,
-                "status": getattr(r, "status", None) or ("voided" if is_void else ("paid" if getattr(r, "paid", False) else "unpaid")),
+    # Streamed: rows come off a server-side cursor in chunks and are encoded as they arrive
+    rows = qs.order_by(TicketSale.created_at.desc()).yield_per(1000)
+    epoch_ms = _want_epoch_ms()
+    summary = {"count": 0, "total": 0.0}
+
+    def _items():
+        # Every column is always selected (literals stand in for missing ones), so rows
+        # unpack positionally.
+        for (
+            tid, ref_no, created_at, price, ptype, first, last,
+            bus_id, bus, origin, destination, paid, voided, status, void_reason, paid_total,
+        ) in rows:
+            if not summary["count"]:
+                summary["total"] = float(paid_total or 0)
+            summary["count"] += 1
+            full_name = f"{(first or '').strip()} {(last or '').strip()}".strip()
+            paid = bool(paid)
+            is_void = bool(voided) or (str(status or "").strip().lower() in _VOID_STATUSES)
+
+            item = {
+                "id": tid,
+                "referenceNo": ref_no,
+                "fare": f"{price or 0:.2f}",  # DECIMAL(10,2) formats directly, no float round-trip
+                "paid": paid and not is_void,
+                "status": status or ("voided" if is_void else ("paid" if paid else "unpaid")),
                 "voided": is_void,
-                "passenger_type": (r.passenger_type or "regular"),
-                "commuter": commuter_display,
-                "is_guest": bool(is_guest),
-                "bus_id": r.bus_id,
-                "bus": r.bus,
-                "origin": r.origin or "",
-                "destination": r.destination or "",
-                "void_reason": getattr(r, "void_reason", None),
+                "passenger_type": (ptype or "regular"),
+                "commuter": full_name or "Guest",
+                "is_guest": not full_name,
+                "bus_id": bus_id,
+                "bus": bus,
+                "origin": origin or "",
+                "destination": destination or "",
+                "void_reason": void_reason,
             }
-        )
+            if epoch_ms:
+                item["created_at_ms"] = _epoch_ms(created_at) if created_at else None
+            else:
+                item["created_at"] = created_at.isoformat() if created_at else None
+                item["time"] = _fmt_minute(created_at) if created_at else None
+            yield item
 
     if want_array:
-        return jsonify(items), 200
-    else:
-        return jsonify(
-            {
-                "tickets": items,
-                "count": len(items),
-                "total": round(revenue_ex_voided_paid, 2),
-                "include_voided": bool(include_voided),
-                "date": day.isoformat(),
-                "bus_id": bus_id_filter,
-            }
-        ), 200
+        return _stream_json_array(_items())
+
+    def _summary():
+        return {
+            "count": summary["count"],
+            "total": round(summary["total"], 2),
+            "include_voided": bool(include_voided),
+            "date": day.isoformat(),
+            "bus_id": bus_id_filter,
+        }
+
+    return _stream_json_array(_items(), key="tickets", trailer=_summary)
 
 from datetime import datetime as _dt, timedelta as _td, timezone as _tz
 from sqlalchemy import func, text
@@ -1984,6 +2720,7 @@ def route_data_insights():
         - trip_id=<int>
         OR
         - date=YYYY-MM-DD & bus_id=<int> & from=HH:MM & to=HH:MM
+        - series=1|0   (default 1; 0 → metrics only, occupancy is [])
 
       Returns:
         {
@@ -2000,6 +2737,7 @@ def route_data_insights():
         pass
 
     trip_id = request.args.get("trip_id", type=int)
+    want_series = (request.args.get("series", "1").strip().lower() in {"1", "true", "yes"})
     use_snapshot = False
 
     def _trip_window(day_, start_t, end_t):
@@ -2053,7 +2791,7 @@ def route_data_insights():
             return jsonify(error="trip_id OR (date & bus_id & from & to) required"), 400
 
         try:
-            day = _dt.strptime(date_str, "%Y-%m-%d").date()
+            day = _parse_iso_date(date_str)
         except ValueError:
             return jsonify(error="invalid date format"), 400
 
@@ -2063,8 +2801,8 @@ def route_data_insights():
         except KeyError:
             return jsonify(error="'from' and 'to' are required"), 400
 
-        window_from = _dt.combine(day, _dt.strptime(start, "%H:%M").time())
-        window_to = _dt.combine(day, _dt.strptime(end, "%H:%M").time())
+        window_from = _dt.combine(day, _parse_hhmm(start))
+        window_to = _dt.combine(day, _parse_hhmm(end))
         if window_to <= window_from:
             window_to = window_to + _td(days=1)
         window_end_excl = window_to + _td(minutes=1)
@@ -2084,101 +2822,337 @@ def route_data_insights():
     except Exception:
         dialect = ""
 
-    # Build the per-minute label in a way that works on your DB
+    # Build the per-minute label in a way that works on your DB.
+    # Group on an integer: minutes since window_from (window_from is on a whole minute, so
+    # these are clock minutes), turned into "HH:MM" after aggregation. Cheaper to compute/
+    # compare than a formatted string, and it sorts chronologically across midnight. The
+    # timestamp range filter below stays a plain index range on (bus_id, timestamp).
+    minute_offsets = True
     if dialect in ("mysql", "mariadb"):
-        hhmm_expr = func.date_format(SensorReading.timestamp, "%H:%i")
+        hhmm_expr = func.timestampdiff(literal_column("MINUTE"), window_from, SensorReading.timestamp)
     elif dialect in ("postgresql", "postgres"):
-        hhmm_expr = func.to_char(SensorReading.timestamp, 'HH24:MI')
-    else:  # default to SQLite-style strftime (works on SQLite, and SQLAlchemy will emulate on others if available)
+        hhmm_expr = cast(func.floor(func.date_part("epoch", SensorReading.timestamp - window_from) / 60), Integer)
+    elif dialect == "sqlite":
+        # whole seconds since window_from, integer-divided (rows before window_from are filtered out)
+        hhmm_expr = cast(
+            (func.strftime("%s", SensorReading.timestamp) - func.strftime("%s", window_from)) / 60, Integer
+        )
+    else:  # unknown backend: format in SQL and hope it has strftime
+        minute_offsets = False
         hhmm_expr = func.strftime("%H:%M", SensorReading.timestamp)
 
     hhmm = hhmm_expr.label("hhmm")
 
     # ── Aggregate per minute ────────────────────────────────────────────────
-    occ_rows = (
-        db.session.query(
+    per_minute = (
+        select(
             hhmm,
             func.max(SensorReading.total_count).label("pax"),
             func.sum(SensorReading.in_count).label("ins"),
             func.sum(SensorReading.out_count).label("outs"),
         )
-        .filter(
+        .where(
             SensorReading.bus_id == bus_id,
             SensorReading.timestamp >= window_from,
             SensorReading.timestamp < window_end_excl,
         )
         .group_by(hhmm)         # group by the expression, not the string name (cross-DB safe)
-        .order_by(hhmm)
-        .all()
     )
 
+    if not want_series:
+        # Metrics-only: reduce the per-minute rows in SQL, nothing but one row comes back
+        if not metrics:
+            m = per_minute.cte("per_minute")
+            avg_pax, peak_pax, boarded, alighted, start_pax, end_pax = db.session.execute(
+                select(
+                    func.avg(m.c.pax),
+                    func.max(m.c.pax),
+                    func.sum(m.c.ins),
+                    func.sum(m.c.outs),
+                    select(m.c.pax).order_by(m.c.hhmm.asc()).limit(1).scalar_subquery(),
+                    select(m.c.pax).order_by(m.c.hhmm.desc()).limit(1).scalar_subquery(),
+                )
+            ).one()
+            start_pax, end_pax = int(start_pax or 0), int(end_pax or 0)
+            metrics = {
+                "avg_pax": round(float(avg_pax or 0)),
+                "peak_pax": int(peak_pax or 0),
+                "boarded": int(boarded or 0),
+                "alighted": int(alighted or 0),
+                "start_pax": start_pax,
+                "end_pax": end_pax,
+                "net_change": end_pax - start_pax,
+            }
+        return _json_response({"occupancy": [], "meta": meta, "metrics": metrics, "snapshot": use_snapshot})
+
+    occ_rows = db.session.execute(per_minute.order_by(hhmm)).all()
+
+    # Column-wise (one int list per measure): the metrics below are builtin C reductions
+    # over these lists instead of per-dict lookups
+    times, pax, ins, outs = zip(*occ_rows) if occ_rows else ((), (), (), ())
+    if minute_offsets:
+        times = [fmt_hhmm(window_from + timedelta(minutes=int(off))) for off in times]
+    pax = [int(v or 0) for v in pax]
+    ins = [int(v or 0) for v in ins]
+    outs = [int(v or 0) for v in outs]
+
     series = [
-        {
-            "time": r.hhmm,
-            "passengers": int(r.pax or 0),
-            "in": int(r.ins or 0),
-            "out": int(r.outs or 0),
-        }
-        for r in occ_rows
+        {"time": t, "passengers": p, "in": i, "out": o}
+        for t, p, i, o in zip(times, pax, ins, outs)
     ]
 
     # ── Compute metrics when we didn't return a stored snapshot ─────────────
     if not metrics:
-        pax_values = [p["passengers"] for p in series]
-        avg_pax = round(sum(pax_values) / len(pax_values)) if pax_values else 0
-        peak_pax = max(pax_values) if pax_values else 0
-        boarded = sum(p["in"] for p in series)
-        alighted = sum(p["out"] for p in series)
-        start_pax = pax_values[0] if pax_values else 0
-        end_pax = pax_values[-1] if pax_values else 0
+        start_pax = pax[0] if pax else 0
+        end_pax = pax[-1] if pax else 0
         metrics = {
-            "avg_pax": avg_pax,
-            "peak_pax": peak_pax,
-            "boarded": boarded,
-            "alighted": alighted,
+            "avg_pax": round(sum(pax) / len(pax)) if pax else 0,
+            "peak_pax": max(pax, default=0),
+            "boarded": sum(ins),
+            "alighted": sum(outs),
             "start_pax": start_pax,
             "end_pax": end_pax,
             "net_change": end_pax - start_pax,
         }
 
-    return jsonify(occupancy=series, meta=meta, metrics=metrics, snapshot=use_snapshot), 200
+    return _json_response({"occupancy": series, "meta": meta, "metrics": metrics, "snapshot": use_snapshot})
 
 # ─────────────────────────────────────────────
 # Sensor readings (ingest & view)
 # ─────────────────────────────────────────────
+# lower-cased Bus.identifier (or numeric deviceId) → Bus.id; the fleet is small and rarely changes.
+# Per process: update_bus clears this worker's copy, the TTL bounds how long other workers keep
+# a renamed identifier. Unknown deviceIds are remembered briefly so a misconfigured sensor
+# doesn't cost a query per POST. Guarded by _bus_id_lock; queries run outside it, and
+# _bus_id_gen keeps a lookup that raced an invalidation from storing what it read before.
+_BUS_ID_TTL_S = 60
+_BUS_ID_MISS_TTL_S = 30
+_bus_id_cache: dict[str, int] = {}
+_bus_id_misses: dict[str, float] = {}
+_bus_id_cache_expires = 0.0
+_bus_id_gen = 0
+_bus_id_lock = threading.Lock()
+
+def _invalidate_bus_ids() -> None:
+    global _bus_id_cache_expires, _bus_id_gen
+    with _bus_id_lock:
+        _bus_id_gen += 1
+        _bus_id_cache.clear()
+        _bus_id_misses.clear()
+        _bus_id_cache_expires = 0.0
+
+def _bus_id_for_device(device_id: str) -> int | None:
+    """
+    Resolve a sensor deviceId to a Bus.id: identifier match (case-insensitive) first,
+    then numeric Bus.id. Served from a per-process dict; misses fall through to one query.
+    An identifier moved to another bus is picked up at once by the worker that ran
+    update_bus; the other workers keep the old mapping for up to _BUS_ID_TTL_S.
+    """
+    global _bus_id_cache_expires
+    key = device_id.lower()
+    now = time.monotonic()
+    with _bus_id_lock:
+        gen = _bus_id_gen
+        stale = not _bus_id_cache or now >= _bus_id_cache_expires
+    if stale:
+        fresh = {
+            ident.lower(): bid
+            for bid, ident in db.session.execute(select(Bus.id, Bus.identifier)).all()
+        }
+        with _bus_id_lock:
+            if gen == _bus_id_gen:
+                _bus_id_cache.clear()
+                _bus_id_misses.clear()
+                _bus_id_cache.update(fresh)
+                _bus_id_cache_expires = now + _BUS_ID_TTL_S
+        bid = fresh.get(key)
+        if bid is not None:
+            return bid
+    else:
+        with _bus_id_lock:
+            bid = _bus_id_cache.get(key)
+            missed = _bus_id_misses.get(key, 0.0) > now
+        if bid is not None:
+            return bid
+        if missed:
+            return None
+
+    # Not cached: a bus added/renamed since the cache was warmed, or a numeric id. One
+    # query for both (identifier is case-insensitive by collation); an identifier match
+    # outranks a numeric-id match, as the old two-step lookup did.
+    match_ident = Bus.identifier == device_id
+    stmt = select(Bus.id)
+    if key.isdigit():
+        stmt = stmt.where(or_(match_ident, Bus.id == int(key))).order_by(match_ident.desc()).limit(1)
+    else:
+        stmt = stmt.where(match_ident)
+    bid = db.session.execute(stmt).scalar()
+    with _bus_id_lock:
+        if gen == _bus_id_gen:
+            if bid is not None:
+                _bus_id_cache[key] = bid
+            else:
+                _bus_id_misses[key] = now + _BUS_ID_MISS_TTL_S
+    return bid
+
+_SENSOR_FIELDS = ("deviceId", "in", "out", "total")
+
+def _retrying_disconnect(unit):
+    """
+    Run `unit()` — a whole ingest unit: device/trip lookups, insert, commit — and run it
+    once more if the pooled connection turned out to be dead (possible with
+    DB_POOL_PRE_PING=0). A stale connection fails on its first statement, before anything
+    was written, so the rerun starts clean.
+    """
+    try:
+        return unit()
+    except DBAPIError as e:
+        if not e.connection_invalidated:
+            raise
+        db.session.rollback()
+        current_app.logger.warning("[sensor] stale DB connection, retrying once")
+        return unit()
+
+def _insert_sensor_rows(rows: list[dict]) -> None:
+    db.session.execute(SensorReading.__table__.insert(), rows)
+    db.session.commit()
+
+def _sensor_rows(items: list[dict], now: datetime) -> tuple[list[dict], list[str]]:
+    """
+    Validate sensor payloads and build sensor_readings insert rows.
+    Returns (rows, unknown_device_ids). Raises ValueError/TypeError on non-integer counts.
+    """
+    rows: list[dict] = []
+    unknown: list[str] = []
+    for item in items:
+        device_id = str(item["deviceId"]).strip()
+        bus_id = _bus_id_for_device(device_id)
+        if bus_id is None:
+            unknown.append(device_id)
+            continue
+        rows.append({
+            "in_count": int(item["in"]),
+            "out_count": int(item["out"]),
+            "total_count": int(item["total"]),
+            "bus_id": bus_id,
+            "timestamp": now,
+        })
+    return rows, unknown
+
+# ── Queued sensor ingest (?async=1) ─────────────────────────────────────
+# Readings are validated in the request, then one writer thread inserts them in batches
+# (up to SENSOR_BATCH_MAX rows or SENSOR_BATCH_WAIT_S idle) with a single commit each,
+# instead of one transaction + redo-log flush per POST.
+SENSOR_BATCH_MAX = 500
+SENSOR_BATCH_WAIT_S = 0.1
+
+_sensor_q: "queue.Queue[dict]" = queue.Queue()
+_sensor_writer: threading.Thread | None = None
+_sensor_writer_lock = threading.Lock()
+
+def _sensor_writer_run(app) -> None:
+    while True:
+        batch = [_sensor_q.get()]
+        deadline = time.monotonic() + SENSOR_BATCH_WAIT_S
+        while len(batch) < SENSOR_BATCH_MAX:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(_sensor_q.get(timeout=timeout))
+            except queue.Empty:
+                break
+        with app.app_context():
+            try:
+                _retrying_disconnect(lambda: _insert_sensor_rows(batch))
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("[sensor] queued insert of %d readings failed", len(batch))
+            finally:
+                db.session.remove()
+
+def _flush_sensor_queue(app) -> None:
+    """
+    At interpreter exit: write whatever is still queued (the writer is a daemon thread and
+    would be dropped mid-wait), in SENSOR_BATCH_MAX chunks. Best-effort, like the writer.
+    """
+    batch: list[dict] = []
+    while True:
+        try:
+            batch.append(_sensor_q.get_nowait())
+        except queue.Empty:
+            pass
+        else:
+            if len(batch) < SENSOR_BATCH_MAX:
+                continue
+        if not batch:
+            return
+        with app.app_context():
+            try:
+                _retrying_disconnect(lambda: _insert_sensor_rows(batch))
+            except Exception:
+                db.session.rollback()
+                app.logger.exception("[sensor] exit flush of %d readings failed", len(batch))
+                return
+            finally:
+                db.session.remove()
+        batch = []
+
+def _enqueue_sensor_rows(rows: list[dict]) -> None:
+    global _sensor_writer
+    if _sensor_writer is None or not _sensor_writer.is_alive():
+        with _sensor_writer_lock:
+            if _sensor_writer is None:
+                atexit.register(_flush_sensor_queue, current_app._get_current_object())
+            if _sensor_writer is None or not _sensor_writer.is_alive():
+                _sensor_writer = threading.Thread(
+                    target=_sensor_writer_run,
+                    args=(current_app._get_current_object(),),
+                    name="sensor-writer",
+                    daemon=True,
+                )
+                _sensor_writer.start()
+    for row in rows:
+        _sensor_q.put(row)
+
+def _want_async() -> bool:
+    return (request.args.get("async", "0").strip().lower() in {"1", "true", "yes"})
+
 @manager_bp.route("/sensor-readings", methods=["POST"])
 @require_role("manager")
 def create_sensor_reading():
+    """
+    POST /manager/sensor-readings
+      Body: { "deviceId": "bus-01", "in": 1, "out": 0, "total": 12 }
+      Query: async=1|0 (default 0) → 202 { queued: true, timestamp } and a batched write
+             shortly after, instead of 201 { id, timestamp } after this row's own commit.
+    """
     data = request.get_json() or {}
-    missing = [k for k in ("deviceId", "in", "out", "total") if k not in data]
+    missing = [k for k in _SENSOR_FIELDS if k not in data]
     if missing:
         return jsonify(error=f"Missing field(s): {', '.join(missing)}"), 400
 
-    device_id = str(data["deviceId"]).strip()
-    bus = (
-        Bus.query.filter(func.lower(Bus.identifier) == device_id.lower()).first()
-        or (Bus.query.get(int(device_id)) if device_id.isdigit() else None)
-    )
-    if not bus:
-        return jsonify(error="Invalid deviceId: Bus not found"), 404
-
     try:
         now = datetime.utcnow()
-        reading = SensorReading(
-            in_count=int(data["in"]),
-            out_count=int(data["out"]),
-            total_count=int(data["total"]),
-            bus_id=bus.id,
-            timestamp=now,
-        )
+        queued = _want_async()
+
+        def _ingest():
+            rows, unknown = _sensor_rows([data], now)
+            if unknown or queued:
+                return rows, unknown, None
+            res = db.session.execute(SensorReading.__table__.insert().values(rows[0]))
+            db.session.commit()
+            return rows, unknown, res.inserted_primary_key[0]
 
-        active = _active_trip_for(bus.id, now)
-        if active:
-            reading.trip_id = active.id
+        rows, unknown, new_id = _retrying_disconnect(_ingest)
+        if unknown:
+            return jsonify(error="Invalid deviceId: Bus not found"), 404
 
-        db.session.add(reading)
-        db.session.commit()
-        return jsonify(id=reading.id, timestamp=reading.timestamp.isoformat()), 201
+        if queued:
+            _enqueue_sensor_rows(rows)
+            return jsonify(queued=True, timestamp=now.isoformat()), 202
+
+        return jsonify(id=new_id, timestamp=now.isoformat()), 201
     except (ValueError, TypeError):
         db.session.rollback()
         return jsonify(error="in/out/total must be integers"), 400
@@ -2187,32 +3161,139 @@ def create_sensor_reading():
         current_app.logger.exception("Unexpected error inserting sensor reading")
         return jsonify(error=str(e)), 500
 
+@manager_bp.route("/sensor-readings/batch", methods=["POST"])
+@require_role("manager")
+def create_sensor_readings_batch():
+    """
+    POST /manager/sensor-readings/batch
+      Body: [ { "deviceId": "bus-01", "in": 1, "out": 0, "total": 12 }, ... ]
+      Query: async=1|0 (default 0) → 202 { queued: <int>, unknown_devices } (queued writer)
+      Returns: { inserted: <int>, unknown_devices: [<deviceId>, ...] }
+    One multi-row INSERT and one commit for the whole batch.
+    """
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return jsonify(error="body must be a non-empty array of readings"), 400
+    for i, item in enumerate(items):
+        missing = [k for k in _SENSOR_FIELDS if not isinstance(item, dict) or k not in item]
+        if missing:
+            return jsonify(error=f"item {i}: missing field(s): {', '.join(missing)}"), 400
+
+    try:
+        now = datetime.utcnow()
+        queued = _want_async()
+
+        def _ingest():
+            rows, unknown = _sensor_rows(items, now)
+            if rows and not queued:
+                _insert_sensor_rows(rows)
+            return rows, unknown
+
+        rows, unknown = _retrying_disconnect(_ingest)
+        if queued:
+            _enqueue_sensor_rows(rows)
+            return jsonify(queued=len(rows), unknown_devices=sorted(set(unknown))), 202
+        return jsonify(inserted=len(rows), unknown_devices=sorted(set(unknown))), 201
+    except (ValueError, TypeError):
+        db.session.rollback()
+        return jsonify(error="in/out/total must be integers"), 400
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Unexpected error inserting sensor reading batch")
+        return jsonify(error=str(e)), 500
+
 @manager_bp.route("/buses/<string:device_id>/sensor-readings", methods=["GET"])
 @require_role("manager")
 def list_bus_readings(device_id: str):
-    bus = Bus.query.filter_by(identifier=device_id).first_or_404()
+    """
+    GET /manager/buses/<device_id>/sensor-readings
+      Query:
+        - limit=<int>              (default 500, max 5000)
+        - from=<ISO> / to=<ISO>    (optional window: from <= timestamp < to)
+        - before=<ISO timestamp>   (keyset cursor: only readings older than this)
+        - before_id=<int>          (tie-break with before: same timestamp, smaller id)
+        - array=1|0                (default 1: plain array; 0: { readings, next_before, next_before_id })
+        - ts=iso|ms                (ms → timestamp_ms epoch ints instead of ISO timestamps)
+    """
+    bus_id = db.session.execute(select(Bus.id).where(Bus.identifier == device_id)).scalar()
+    if bus_id is None:
+        abort(404)
 
-    readings = (
-        SensorReading.query.filter_by(bus_id=bus.id)
-        .order_by(SensorReading.timestamp.desc())
-        .all()
-    )
+    limit = request.args.get("limit", default=500, type=int) or 500
+    limit = max(1, min(limit, 5000))
+    want_array = (request.args.get("array", "1").strip().lower() in {"1", "true", "yes"})
 
-    return (
-        jsonify(
-            [
-                {
-                    "id": r.id,
-                    "timestamp": r.timestamp.isoformat(),
-                    "in_count": r.in_count,
-                    "out_count": r.out_count,
-                    "total_count": r.total_count,
-                }
-                for r in readings
-            ]
-        ),
-        200,
+    stmt = select(
+        SensorReading.id,
+        SensorReading.timestamp,
+        SensorReading.in_count,
+        SensorReading.out_count,
+        SensorReading.total_count,
+    ).where(SensorReading.bus_id == bus_id)
+
+    bounds = {}
+    for key in ("from", "to", "before"):
+        raw = (request.args.get(key) or "").strip()
+        if raw:
+            try:
+                bounds[key] = datetime.fromisoformat(raw.replace("Z", "+00:00")).replace(tzinfo=None)
+            except ValueError:
+                return jsonify(error=f"invalid {key} (use ISO timestamp)"), 400
+    if "from" in bounds:
+        stmt = stmt.where(SensorReading.timestamp >= bounds["from"])
+    if "to" in bounds:
+        stmt = stmt.where(SensorReading.timestamp < bounds["to"])
+    if "before" in bounds:
+        before, before_id = bounds["before"], request.args.get("before_id", type=int)
+        if before_id is None:
+            stmt = stmt.where(SensorReading.timestamp < before)
+        else:
+            # (timestamp, id) < (before, before_id), spelled out so it stays an index range
+            stmt = stmt.where(
+                or_(
+                    SensorReading.timestamp < before,
+                    (SensorReading.timestamp == before) & (SensorReading.id < before_id),
+                )
+            )
+
+    # Streamed off a server-side cursor: rows are encoded as they arrive, never listed in full
+    rows = db.session.execute(
+        stmt.order_by(SensorReading.timestamp.desc(), SensorReading.id.desc())
+        .limit(limit)
+        .execution_options(yield_per=500)
     )
+    ts_key = "timestamp_ms" if _want_epoch_ms() else "timestamp"
+    fmt_ts = _epoch_ms if ts_key == "timestamp_ms" else datetime.isoformat
+    last = {"n": 0, "id": None, "ts": None}
+
+    def _readings():
+        for rid, ts, in_c, out_c, tot in rows:
+            last["n"] += 1
+            last["id"], last["ts"] = rid, ts
+            yield {
+                "id": rid,
+                ts_key: fmt_ts(ts),
+                "in_count": in_c,
+                "out_count": out_c,
+                "total_count": tot,
+            }
+
+    if want_array:
+        resp = _stream_json_array(_readings())
+    else:
+        def _cursor():
+            more = last["n"] == limit
+            return {
+                "next_before": last["ts"].isoformat() if more else None,
+                "next_before_id": last["id"] if more else None,
+            }
+
+        resp = _stream_json_array(_readings(), key="readings", trailer=_cursor)
+
+    # Dashboards poll this; let the browser reuse a page for a few seconds
+    resp.cache_control.private = True
+    resp.cache_control.max_age = 5
+    return resp
 
 # ─────────────────────────────────────────────
 # QR templates & fare segments
@@ -2228,37 +3309,88 @@ def upload_qr():
         return jsonify(error="invalid fare_segment_id"), 400
 
     file = request.files["file"]
-    fname = secure_filename(f"{uuid.uuid4().hex}{os.path.splitext(file.filename)[1]}")
-    file.save(os.path.join(UPLOAD_DIR, fname))
+    # Only the extension comes from the client; the basename is random hex
+    ext = (file.filename or "").rsplit(".", 1)[-1].lower()
+    if ext not in _QR_EXTS:
+        return jsonify(error=f"unsupported file type (allowed: {', '.join(sorted(_QR_EXTS))})"), 400
+    fname = f"{secrets.token_hex(16)}.{ext}"
+    path = os.path.join(UPLOAD_DIR, fname)
+    _save_upload(file, path)
 
     tpl = QRTemplate(file_path=fname, price=seg.price, fare_segment_id=seg.id)
     db.session.add(tpl)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # No row points at the file, so don't leave it behind
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        raise
+    _clear_report_cache()
 
     return jsonify(id=tpl.id, url=f"/manager/qr-templates/{tpl.id}/file", price=f"{seg.price:.2f}"), 201
 
 @manager_bp.route("/qr-templates", methods=["GET"])
 @require_role("manager")
+@_cached_get(_REFERENCE_TTL_S)
 def list_qr():
-    return (
-        jsonify([{"id": t.id, "url": f"/manager/qr-templates/{t.id}/file", "price": f"{t.price:.2f}"} for t in QRTemplate.query.order_by(QRTemplate.created_at.desc())]),
-        200,
+    rows = db.session.execute(
+        select(QRTemplate.id, QRTemplate.price).order_by(QRTemplate.created_at.desc())
+    ).all()
+    return _json_response(
+        [{"id": tid, "url": f"/manager/qr-templates/{tid}/file", "price": f"{price:.2f}"} for tid, price in rows]
     )
 
 @manager_bp.route("/qr-templates/<int:tpl_id>/file", methods=["GET"])
 def serve_qr_file(tpl_id):
-    tpl = QRTemplate.query.get_or_404(tpl_id)
-    return send_from_directory(UPLOAD_DIR, tpl.file_path)
+    file_path = db.session.execute(
+        select(QRTemplate.file_path).where(QRTemplate.id == tpl_id)
+    ).scalar_one_or_none()
+    if file_path is None:
+        abort(404)
+
+    # File names are random hex and never rewritten → the name is the ETag, and a
+    # revalidation is answered with 304 before anything touches the disk or the proxy
+    etag = file_path.rsplit(".", 1)[0]
+    if request.if_none_match.contains(etag):
+        resp = current_app.response_class(status=304)
+        resp.set_etag(etag)
+    else:
+        # Let the front proxy stream the bytes so the worker is freed right after the lookup:
+        #  - nginx: QR_ACCEL_REDIRECT_PREFIX=/_protected_qr/ (internal location aliased to UPLOAD_DIR)
+        #  - apache mod_xsendfile: USE_X_SENDFILE=1 (honoured by send_from_directory)
+        accel_prefix = current_app.config.get("QR_ACCEL_REDIRECT_PREFIX")
+        if accel_prefix:
+            resp = current_app.response_class(
+                mimetype=mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            )
+            resp.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{file_path}"
+            resp.set_etag(etag)
+        else:
+            resp = send_from_directory(
+                UPLOAD_DIR, file_path, conditional=True, etag=etag, max_age=_QR_MAX_AGE_S
+            )
+
+    resp.headers["Cache-Control"] = f"public, max-age={_QR_MAX_AGE_S}, immutable"
+    return resp
 
 @manager_bp.route("/fare-segments", methods=["GET"])
 @require_role("manager")
+@_cached_get(_REFERENCE_TTL_S)
 def list_fare_segments():
-    rows = FareSegment.query.order_by(FareSegment.id).all()
-    return (
-        jsonify(
-            [{"id": s.id, "label": f"{s.origin.stop_name} → {s.destination.stop_name}", "price": f"{s.price:.2f}"} for s in rows]
-        ),
-        200,
+    O = aliased(StopTime)
+    D = aliased(StopTime)
+    rows = db.session.execute(
+        select(FareSegment.id, FareSegment.price, O.stop_name, D.stop_name)
+        .join(O, FareSegment.origin_stop_time_id == O.id)
+        .join(D, FareSegment.destination_stop_time_id == D.id)
+        .order_by(FareSegment.id)
+    ).all()
+    return _json_response(
+        [{"id": sid, "label": f"{origin} → {destination}", "price": f"{price:.2f}"} for sid, price, origin, destination in rows]
     )
 
 
@@ -2284,7 +3416,7 @@ def pao_assignments_upsert():
     bid = int(data.get("bus_id") or 0)
     day_str = (data.get("service_date") or _dt.now(MNL).date().isoformat()).strip()
 
-    current_app.logger.info(
+    current_app.logger.debug(
         "[pao-assignments][POST] caller uid=%s role=%s payload={user_id=%s, bus_id=%s, service_date=%s}",
         getattr(g, "user", None) and g.user.id,
         getattr(g, "user", None) and g.user.role,
@@ -2295,7 +3427,7 @@ def pao_assignments_upsert():
         return jsonify(error="user_id and bus_id are required"), 400
 
     try:
-        day = _dt.strptime(day_str, "%Y-%m-%d").date()
+        day = _parse_iso_date(day_str)
     except ValueError:
         return jsonify(error="invalid service_date"), 400
 
@@ -2448,12 +3580,12 @@ def pao_assignments_get():
 
     date_str = (request.args.get("date") or _dt.now(MNL).date().isoformat()).strip()
     try:
-        day = _dt.strptime(date_str, "%Y-%m-%d").date()
+        day = _parse_iso_date(date_str)
     except ValueError:
         current_app.logger.info("[pao-assignments][GET] invalid date=%r", date_str)
         return jsonify(error="invalid date format"), 400
 
-    current_app.logger.info(
+    current_app.logger.debug(
         "[pao-assignments][GET] caller uid=%s role=%s date=%s",
         getattr(g, "user", None) and g.user.id,
         getattr(g, "user", None) and g.user.role,
@@ -2489,7 +3621,7 @@ def pao_assignments_get():
             "user_id": int(r["user_id"]),
             "pao_name": name,
         })
-    current_app.logger.info("[pao-assignments][GET] rows=%d", len(out))
+    current_app.logger.debug("[pao-assignments][GET] rows=%d", len(out))
     return jsonify(out), 200
 
 
@@ -2500,12 +3632,12 @@ def driver_assignments_get():
 
     date_str = (request.args.get("date") or _dt.now(MNL).date().isoformat()).strip()
     try:
-        day = _dt.strptime(date_str, "%Y-%m-%d").date()
+        day = _parse_iso_date(date_str)
     except ValueError:
         current_app.logger.info("[driver-assignments][GET] invalid date=%r", date_str)
         return jsonify(error="invalid date format"), 400
 
-    current_app.logger.info(
+    current_app.logger.debug(
         "[driver-assignments][GET] caller uid=%s role=%s date=%s",
         getattr(g, "user", None) and g.user.id,
         getattr(g, "user", None) and g.user.role,
@@ -2537,7 +3669,7 @@ def driver_assignments_get():
             "user_id": int(r["user_id"]),
             "driver_name": name,
         })
-    current_app.logger.info("[driver-assignments][GET] rows=%d", len(out))
+    current_app.logger.debug("[driver-assignments][GET] rows=%d", len(out))
     return jsonify(out), 200
 
 @manager_bp.route("/driver-assignments", methods=["POST"], endpoint="driver_assignments_upsert")
@@ -2562,7 +3694,7 @@ def driver_assignments_upsert():
     bid = int(data.get("bus_id") or 0)
     day_str = (data.get("service_date") or _dt.now(MNL).date().isoformat()).strip()
 
-    current_app.logger.info(
+    current_app.logger.debug(
         "[driver-assignments][POST] caller uid=%s role=%s payload={user_id=%s, bus_id=%s, service_date=%s}",
         getattr(g, "user", None) and g.user.id,
         getattr(g, "user", None) and g.user.role,
@@ -2572,7 +3704,7 @@ def driver_assignments_upsert():
     if not (uid and bid):
         return jsonify(error="user_id and bus_id are required"), 400
     try:
-        day = _dt.strptime(day_str, "%Y-%m-%d").date()
+        day = _parse_iso_date(day_str)
     except ValueError:
         return jsonify(error="invalid service_date"), 400
 
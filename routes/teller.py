@@ -14,6 +14,7 @@ from models.user import User
 from models.wallet import WalletAccount, WalletLedger, TopUp
 from models.device_token import DeviceToken
 from utils.push import push_to_user  # (kept if you still use FCM push elsewhere)
+from utils.reason_log import log_dir, lookup_reason
 
 try:
     from routes.auth import require_role
@@ -301,12 +302,13 @@ def _reject_reason_path(tid: int) -> str:
     return os.path.join(current_app.root_path, "static", RECEIPTS_DIR, f"{tid}.reject.txt")
 
 def _reject_reason_if_exists(tid: int) -> Optional[str]:
-    """Return the saved reject reason text, if present."""
+    """Return the saved reject reason text, if present (per-top-up file, else manager void log)."""
     try:
         p = _reject_reason_path(tid)
         if os.path.exists(p):
             with open(p, "r", encoding="utf-8") as f:
                 return (f.read() or "").strip() or None
+        return lookup_reason(log_dir(current_app), tid)
     except Exception:
         current_app.logger.exception("[teller] read reject reason failed tid=%s", tid)
     return None
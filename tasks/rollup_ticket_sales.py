@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from db import db
+from models.ticket_sale import TicketSale
+from models.ticket_sale_daily import TicketSaleDaily, TicketSaleDailyDay
+from sqlalchemy import Date, func
+
+def rollup_ticket_sales(days_back=7, today=None, since=None):
+    """
+    Rebuild ticket_sale_daily for the last `days_back` complete days, or from `since`
+    (a date) when given — the backfill. Days invalidated by a void/unvoid since they were
+    rolled up are rebuilt as well, so a nightly run keeps the covered span whole.
+    Today is never rolled up (ticket_metrics reads it live). Re-running is safe.
+    """
+    TicketSaleDaily.__table__.create(bind=db.engine, checkfirst=True)
+    TicketSaleDailyDay.__table__.create(bind=db.engine, checkfirst=True)
+
+    today = today or datetime.utcnow().date()
+    first = since or today - timedelta(days=days_back)
+
+    # Holes: uncovered days between the earliest covered day and this window
+    covered_from = db.session.query(func.min(TicketSaleDailyDay.day)).scalar()
+    if covered_from and covered_from < first:
+        n_covered = (
+            db.session.query(func.count(TicketSaleDailyDay.day))
+            .filter(TicketSaleDailyDay.day >= covered_from, TicketSaleDailyDay.day < first)
+            .scalar()
+        )
+        if n_covered < (first - covered_from).days:
+            covered = {
+                d for (d,) in db.session.query(TicketSaleDailyDay.day)
+                .filter(TicketSaleDailyDay.day >= covered_from, TicketSaleDailyDay.day < first)
+            }
+            first = min(
+                covered_from + timedelta(days=i)
+                for i in range((first - covered_from).days)
+                if covered_from + timedelta(days=i) not in covered
+            )
+
+    if first >= today:
+        db.session.commit()
+        return 0
+    start = datetime.combine(first, datetime.min.time())
+    end   = datetime.combine(today, datetime.min.time())
+
+    # Fresh transaction that starts by deleting the window, so the DELETE's row/gap locks are
+    # held before the aggregate reads its snapshot. A void committed earlier is in the
+    # snapshot; one committing later blocks in invalidate_rollup_days (same table order:
+    # coverage first) until this commit, then drops the day again. Deleting the window
+    # wholesale also makes (day, bus) pairs that are now fully voided disappear.
+    db.session.commit()
+    for model in (TicketSaleDailyDay, TicketSaleDaily):
+        model.query.filter(model.day >= first, model.day < today).delete(synchronize_session=False)
+
+    day = func.date(TicketSale.created_at, type_=Date)
+    rows = (
+        db.session.query(
+            day,
+            TicketSale.bus_id,
+            func.count(TicketSale.id),
+            func.coalesce(func.sum(TicketSale.price), 0),
+        )
+        .filter(
+            TicketSale.created_at >= start,
+            TicketSale.created_at < end,
+            TicketSale.voided.is_(False),
+        )
+        .group_by(day, TicketSale.bus_id)
+        .all()
+    )
+
+    if rows:
+        db.session.execute(
+            TicketSaleDaily.__table__.insert(),
+            [{"day": d, "bus_id": b, "tickets": int(n), "revenue": rev} for d, b, n, rev in rows],
+        )
+    now = datetime.utcnow()
+    db.session.execute(
+        TicketSaleDailyDay.__table__.insert(),
+        [{"day": first + timedelta(days=i), "rolled_at": now} for i in range((today - first).days)],
+    )
+    db.session.commit()
+    return len(rows)
+
+def invalidate_rollup_days(days) -> None:
+    """
+    Drop the rollup (rows + coverage) for `days` after their tickets changed void state, in
+    the caller's transaction; readers aggregate those days live until the next rollup run
+    rebuilds them. A savepoint keeps a missing rollup table from failing the caller.
+    """
+    days = sorted(set(days))
+    if not days:
+        return
+    try:
+        with db.session.begin_nested():
+            for model in (TicketSaleDailyDay, TicketSaleDaily):
+                db.session.execute(model.__table__.delete().where(model.__table__.c.day.in_(days)))
+    except Exception:
+        pass  # rollup never built (tables missing): nothing to invalidate
@@ -0,0 +1,89 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures: a throwaway Flask app with the manager blueprint on in-memory SQLite.
+The MySQL-only bits are bridged here, not in the app: the ai_ci collation on
+buses.identifier, the information_schema column probe, and app.py's global
+`SET time_zone` connection hooks (present once app.py has been imported).
+"""
+import importlib
+import pathlib
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+jwt = pytest.importorskip("jwt")
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+from db import db
+
+for _p in sorted(pathlib.Path(__file__).resolve().parent.parent.joinpath("models").glob("*.py")):
+    try:
+        importlib.import_module(f"models.{_p.stem}")
+    except ImportError:
+        pass  # models/tickets.py imports a model that no longer exists
+
+
+def _ci_collation(a: str, b: str) -> int:
+    a, b = a.lower(), b.lower()
+    return (a > b) - (a < b)
+
+
+def _drop_mysql_session_hooks() -> None:
+    app_mod = sys.modules.get("app")
+    if app_mod is None:
+        return
+    for target, name, fn in (
+        (Engine, "connect", getattr(app_mod, "_on_connect", None)),
+        (Pool, "checkout", getattr(app_mod, "_on_checkout", None)),
+    ):
+        if fn is not None and event.contains(target, name, fn):
+            event.remove(target, name, fn)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    import routes.manager as manager
+    from routes.manager import manager_bp
+
+    _drop_mysql_session_hooks()
+
+    app = Flask(__name__, instance_path=str(tmp_path))
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI="sqlite://")
+    db.init_app(app)
+    app.register_blueprint(manager_bp)
+
+    monkeypatch.setattr(
+        manager,
+        "_schema_cols",
+        lambda table: frozenset(db.metadata.tables[table].c.keys()) if table in db.metadata.tables else frozenset(),
+    )
+    manager._clear_report_cache()
+
+    with app.app_context():
+        event.listen(
+            db.engine, "connect",
+            lambda conn, _: conn.create_collation("utf8mb4_0900_ai_ci", _ci_collation),
+        )
+        db.create_all()
+        yield app
+        db.session.remove()
+    manager._clear_report_cache()
+
+
+@pytest.fixture
+def manager_headers(app):
+    """Authorization header for a manager account."""
+    from auth_guard import SECRET_KEY
+    from models.user import User
+
+    db.session.add(User(id=1, username="mgr", role="manager", passenger_type="regular", password_hash="x"))
+    db.session.commit()
+    token = jwt.encode({"user_id": 1, "exp": int(time.time()) + 3600}, SECRET_KEY, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,77 @@
+# backend/tests/test_bus_readings.py
+"""GET /manager/buses/<device_id>/sensor-readings: (timestamp, id) keyset pages and cursor parsing."""
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+
+from db import db
+from models.bus import Bus
+from models.sensor_reading import SensorReading
+
+URL = "/manager/buses/BUS-1/sensor-readings"
+
+
+@pytest.fixture
+def readings(app):
+    db.session.add(Bus(id=1, identifier="BUS-1"))
+    # ids 2-4 share a timestamp: pages must split them by id without skipping or repeating
+    stamps = [(1, 0), (2, 5), (3, 5), (4, 5), (5, 9), (6, 12)]
+    for rid, minute in stamps:
+        db.session.add(SensorReading(
+            id=rid, bus_id=1, timestamp=datetime(2024, 1, 1, 8, minute),
+            in_count=rid, out_count=0, total_count=rid,
+        ))
+    db.session.commit()
+
+
+def test_pages_follow_the_keyset_cursor(app, readings, manager_headers):
+    client = app.test_client()
+    seen, args = [], {"limit": 2, "array": 0}
+    for _ in range(10):
+        body = client.get(URL, query_string=args, headers=manager_headers).get_json()
+        seen.extend(r["id"] for r in body["readings"])
+        if body["next_before"] is None:
+            break
+        args = {"limit": 2, "array": 0, "before": body["next_before"], "before_id": body["next_before_id"]}
+    assert seen == [6, 5, 4, 3, 2, 1]
+
+
+def test_window_and_plain_array(app, readings, manager_headers):
+    resp = app.test_client().get(
+        URL, query_string={"from": "2024-01-01T08:05:00", "to": "2024-01-01T08:12:00Z"}, headers=manager_headers
+    )
+    assert [r["id"] for r in resp.get_json()] == [5, 4, 3, 2]
+
+
+def test_cursor_without_id_and_epoch_ms(app, readings, manager_headers):
+    body = app.test_client().get(
+        URL, query_string={"before": "2024-01-01T08:05:00", "ts": "ms"}, headers=manager_headers
+    ).get_json()
+    assert [r["id"] for r in body] == [1]
+    # naive timestamps are UTC
+    assert body[0]["timestamp_ms"] == int(datetime(2024, 1, 1, 8, 0, tzinfo=timezone.utc).timestamp()) * 1000
+
+
+@pytest.mark.parametrize("key", ["before", "from", "to"])
+def test_bad_cursor_is_a_400(app, readings, manager_headers, key):
+    resp = app.test_client().get(URL, query_string={key: "yesterday"}, headers=manager_headers)
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == f"invalid {key} (use ISO timestamp)"
+
+
+def test_device_id_resolution_and_invalidation(app, readings):
+    from routes.manager import _bus_id_for_device, _invalidate_bus_ids
+
+    _invalidate_bus_ids()
+    assert _bus_id_for_device("bus-1") == 1
+    assert _bus_id_for_device("1") == 1
+    assert _bus_id_for_device("BUS-2") is None
+
+    db.session.add(Bus(id=2, identifier="BUS-2"))
+    db.session.commit()
+    assert _bus_id_for_device("BUS-2") is None  # remembered miss
+    _invalidate_bus_ids()
+    assert _bus_id_for_device("BUS-2") == 2
@@ -0,0 +1,40 @@
+# backend/tests/test_import_smoke.py
+"""
+Import smoke test: every blueprint module (and app.py, which imports them all) must
+import cleanly — a module-level NameError (e.g. a decorator used before it is
+defined) otherwise only shows up when the server fails to boot.
+"""
+import importlib
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+
+MODULES = [
+    "routes.auth",
+    "routes.commuter",
+    "routes.pao",
+    "routes.manager",
+    "routes.teller",
+    "app",
+]
+
+
+@pytest.mark.parametrize("name", MODULES)
+def test_module_imports(name):
+    importlib.import_module(name)
+
+
+def test_blueprints_register(tmp_path):
+    from flask import Flask
+
+    from routes.manager import manager_bp
+    from routes.commuter import commuter_bp
+
+    app = Flask(__name__, instance_path=str(tmp_path))  # manager creates its reason-log dir there
+    app.register_blueprint(manager_bp)
+    app.register_blueprint(commuter_bp, url_prefix="/commuter")
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules()}
+    assert "manager.revenue_breakdown" in endpoints
+    assert "commuter.get_trip" in endpoints
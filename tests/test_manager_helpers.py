@@ -0,0 +1,96 @@
+# backend/tests/test_manager_helpers.py
+"""Pure helpers in routes/manager.py: strict date/time parsing and rollup coverage runs."""
+from datetime import date, datetime, time
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+
+from routes.manager import _parse_hhmm, _parse_iso_date, _uncovered_runs
+
+
+def test_parse_iso_date_is_strict():
+    assert _parse_iso_date("2024-02-29") == date(2024, 2, 29)
+    for bad in ("2024-2-29", "2024-02-29T10:00", "20240229", "2023-02-29"):
+        with pytest.raises(ValueError):
+            _parse_iso_date(bad)
+
+
+def test_parse_hhmm():
+    assert _parse_hhmm("7:05") == time(7, 5)
+    assert _parse_hhmm("23:59") == time(23, 59)
+    for bad in ("7", "07:5", "24:00", "7:60", "123:00"):
+        with pytest.raises(ValueError):
+            _parse_hhmm(bad)
+
+
+def _d(day: int) -> date:
+    return date(2024, 1, day)
+
+
+def _dt(day: int) -> datetime:
+    return datetime(2024, 1, day)
+
+
+def test_uncovered_runs_nothing_covered():
+    assert _uncovered_runs(_d(1), _d(3), set()) == [(_dt(1), _dt(4))]
+
+
+def test_uncovered_runs_all_covered():
+    assert _uncovered_runs(_d(1), _d(3), {_d(1), _d(2), _d(3)}) == []
+
+
+def test_uncovered_runs_holes_and_edges():
+    covered = {_d(2), _d(3), _d(6)}
+    assert _uncovered_runs(_d(1), _d(7), covered) == [
+        (_dt(1), _dt(2)),
+        (_dt(4), _dt(6)),
+        (_dt(7), _dt(8)),
+    ]
+
+
+def test_uncovered_runs_ignores_days_outside_window():
+    assert _uncovered_runs(_d(5), _d(5), {_d(4), _d(6)}) == [(_dt(5), _dt(6))]
+
+
+def _body(resp) -> bytes:
+    return b"".join(resp.response)
+
+
+def test_stream_json_array_object_form(app):
+    import json
+
+    from routes.manager import _stream_json_array
+
+    with app.test_request_context():
+        resp = _stream_json_array(iter([{"a": 1}, {"a": 2}]), key="rows", trailer=lambda: {"n": 2, "next": None})
+        assert json.loads(_body(resp)) == {"rows": [{"a": 1}, {"a": 2}], "n": 2, "next": None}
+
+        assert json.loads(_body(_stream_json_array(iter([]), key="rows"))) == {"rows": []}
+        assert json.loads(_body(_stream_json_array(iter([])))) == []
+
+
+def test_stream_json_array_failures(app, monkeypatch):
+    import json
+
+    import routes.manager as manager
+
+    monkeypatch.setattr(manager, "_STREAM_BATCH", 1)
+
+    def rows(fail_after):
+        for i in range(fail_after):
+            yield {"i": i}
+        raise RuntimeError("connection lost")
+
+    with app.test_request_context():
+        # Before the first batch: raised from the view, so the error handler still answers
+        with pytest.raises(RuntimeError):
+            manager._stream_json_array(rows(0), key="rows")
+
+        # Mid-body: logged, and the body is left unterminated rather than looking complete
+        body = _body(manager._stream_json_array(rows(2), key="rows", trailer=lambda: {"n": 2}))
+        assert body.startswith(b'{"rows":[') and body.count(b'"i"') == 2
+        assert b"]" not in body and b"\"n\"" not in body  # no closing bracket, no trailer
+        with pytest.raises(ValueError):
+            json.loads(body)
@@ -0,0 +1,49 @@
+# backend/tests/test_reason_log.py
+"""utils/reason_log: batched appends land as JSONL lines, lookups index the file incrementally."""
+import json
+
+import pytest
+
+from utils import reason_log
+
+
+@pytest.fixture
+def fresh_index(monkeypatch):
+    # Lookups below must come from the file, not from the appending process's memory
+    monkeypatch.setattr(reason_log, "_index", {})
+    monkeypatch.setattr(reason_log, "_index_offset", {})
+
+
+def test_appends_are_batched_into_the_log(tmp_path, fresh_index):
+    for tid in (101, 102, 103):
+        reason_log.append_reason(str(tmp_path), tid, f"  reason {tid} ")
+    reason_log.append_reason(str(tmp_path), 104, "   ")  # blank: not logged
+    reason_log._flush_at_exit()
+
+    lines = (tmp_path / reason_log.LOG_NAME).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["tid"] for line in lines] == [101, 102, 103]
+    assert json.loads(lines[0])["reason"] == "reason 101"
+
+
+def test_lookup_reads_new_lines_and_keeps_the_latest(tmp_path, fresh_index):
+    path = tmp_path / reason_log.LOG_NAME
+    path.write_text('{"tid": 7, "reason": "first"}\n', encoding="utf-8")
+    assert reason_log.lookup_reason(str(tmp_path), 7) == "first"
+    assert reason_log.lookup_reason(str(tmp_path), 8) is None
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"tid": 7, "reason": "second"}\n{"tid": 8, "rea')  # last line still being written
+    assert reason_log.lookup_reason(str(tmp_path), 7) == "second"
+    assert reason_log.lookup_reason(str(tmp_path), 8) is None
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('son": "late"}\n')
+    assert reason_log.lookup_reason(str(tmp_path), 8) == "late"
+
+
+def test_log_dir_prefers_config_then_instance_folder(tmp_path):
+    flask = pytest.importorskip("flask")
+    app = flask.Flask(__name__, instance_path=str(tmp_path / "inst"))
+    assert reason_log.log_dir(app) == str(tmp_path / "inst")
+    app.config["REASON_LOG_DIR"] = str(tmp_path / "logs")
+    assert reason_log.log_dir(app) == str(tmp_path / "logs")
@@ -0,0 +1,105 @@
+# backend/tests/test_ticket_reports.py
+"""
+Ticket rollup coverage (tasks/rollup_ticket_sales) and its readers: /manager/metrics/tickets
+merges rolled-up days with live aggregation, and the per-process report cache.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import count
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+
+from db import db
+from models.bus import Bus
+from models.ticket_sale import TicketSale
+from models.ticket_sale_daily import TicketSaleDailyDay
+from tasks.rollup_ticket_sales import invalidate_rollup_days, rollup_ticket_sales
+
+_ref = count(1)
+
+
+def _d(day: int) -> date:
+    return date(2024, 1, day)
+
+
+def _sell(day: int, price: int = 10, voided: bool = False, bus_id: int = 1) -> None:
+    db.session.add(TicketSale(
+        bus_id=bus_id, price=Decimal(price), created_at=datetime(2024, 1, day, 8),
+        reference_no=f"R{next(_ref)}", paid=not voided, voided=voided,
+    ))
+
+
+def _covered() -> list:
+    return sorted(db.session.execute(db.select(TicketSaleDailyDay.day)).scalars())
+
+
+@pytest.fixture
+def sales(app):
+    db.session.add(Bus(id=1, identifier="BUS-1"))
+    for day in range(1, 6):
+        _sell(day)
+        _sell(day, price=5)
+    _sell(2, voided=True)
+    db.session.commit()
+
+
+def test_rollup_covers_the_window_and_skips_voids(sales):
+    assert rollup_ticket_sales(since=_d(1), today=_d(4)) == 3
+    assert _covered() == [_d(1), _d(2), _d(3)]
+
+
+def test_rollup_rebuilds_invalidated_holes(sales):
+    rollup_ticket_sales(since=_d(1), today=_d(5))
+    invalidate_rollup_days([_d(2)])
+    db.session.commit()
+    assert _d(2) not in _covered()
+
+    # The nightly window (last day only) still reaches back to the hole
+    rollup_ticket_sales(days_back=1, today=_d(5))
+    assert _covered() == [_d(1), _d(2), _d(3), _d(4)]
+
+
+def _metrics(client, headers, **args):
+    resp = client.get("/manager/metrics/tickets", query_string={"from": "2024-01-01", "to": "2024-01-05", **args},
+                      headers=headers)
+    assert resp.status_code == 200
+    return resp.get_json()
+
+
+def test_ticket_metrics_merges_rollup_and_live_days(app, sales, manager_headers):
+    rollup_ticket_sales(since=_d(1), today=_d(4))   # days 1-3 rolled up, 4-5 live
+    _sell(3)                                        # not invalidated: day 3 keeps its rollup numbers
+    _sell(4)                                        # live day: counted
+    db.session.commit()
+
+    body = _metrics(app.test_client(), manager_headers)
+    assert [(p["date"], p["tickets"], p["revenue"]) for p in body["daily"]] == [
+        ("2024-01-01", 2, 15.0),
+        ("2024-01-02", 2, 15.0),
+        ("2024-01-03", 2, 15.0),
+        ("2024-01-04", 3, 25.0),
+        ("2024-01-05", 2, 15.0),
+    ]
+    assert body["total_tickets"] == 11
+
+    # An invalidated day falls back to live aggregation, between rolled-up neighbours
+    invalidate_rollup_days([_d(3)])
+    db.session.commit()
+    body = _metrics(app.test_client(), manager_headers, bus_id=1)
+    assert [p["tickets"] for p in body["daily"]] == [2, 2, 3, 3, 2]
+
+
+def test_report_cache_is_cleared_by_ticket_changes(app, sales, manager_headers):
+    client = app.test_client()
+    assert _metrics(client, manager_headers)["total_tickets"] == 10
+
+    _sell(1)
+    db.session.commit()
+    assert _metrics(client, manager_headers)["total_tickets"] == 10  # served from the cache
+
+    db.session.info["tickets_changed"] = True
+    db.session.commit()
+    assert _metrics(client, manager_headers)["total_tickets"] == 11
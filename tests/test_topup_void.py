@@ -0,0 +1,64 @@
+# backend/tests/test_topup_void.py
+"""POST /manager/topups/bulk_void: per-top-up guards, partial failures, ledger running balances."""
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_sqlalchemy")
+
+from db import db
+from models.wallet import TopUp, WalletAccount, WalletLedger
+
+
+@pytest.fixture
+def wallet(app, monkeypatch):
+    import routes.manager as manager
+
+    jobs = []
+    monkeypatch.setattr(manager, "_run_in_background", lambda fn, *args: jobs.append((fn.__name__, args)))
+
+    db.session.add(WalletAccount(user_id=7, balance_pesos=100))
+    now = datetime.utcnow()
+    for tid, amt, status in ((1, 30, "succeeded"), (2, 50, "succeeded"), (3, 40, "pending"), (5, 40, "succeeded")):
+        db.session.add(TopUp(id=tid, account_id=7, method="cash", amount_pesos=amt, status=status, created_at=now))
+    db.session.commit()
+    return jobs
+
+
+def test_bulk_void_reports_partial_failures(app, wallet, manager_headers):
+    resp = app.test_client().post(
+        "/manager/topups/bulk_void", json={"tids": [5, 3, 2, 1, 4]}, headers=manager_headers
+    )
+    assert resp.status_code == 200
+    body = resp.get_json()
+
+    # Processed in id order: 1 and 2 fit the balance, 5 would overdraw it
+    assert body["voided"] == [{"topup_id": 1, "new_balance_php": 70}, {"topup_id": 2, "new_balance_php": 20}]
+    assert {f["topup_id"]: f["error"] for f in body["failed"]} == {
+        3: "only succeeded top-ups can be voided",
+        4: "top-up not found",
+        5: "insufficient wallet balance to reverse (funds already spent)",
+    }
+
+    db.session.expire_all()
+    assert db.session.get(WalletAccount, 7).balance_pesos == 20
+    statuses = dict(db.session.execute(db.select(TopUp.id, TopUp.status)).all())
+    assert statuses == {1: "cancelled", 2: "cancelled", 3: "pending", 5: "succeeded"}
+
+    ledger = db.session.execute(
+        db.select(WalletLedger.ref_id, WalletLedger.amount_pesos, WalletLedger.running_balance_pesos)
+        .order_by(WalletLedger.id)
+    ).all()
+    assert [tuple(r) for r in ledger] == [(1, 30, 70), (2, 50, 20)]
+    assert [name for name, _ in wallet] == ["_notify_topup_void", "_notify_topup_void"]
+
+
+def test_bulk_void_twice_does_not_debit_again(app, wallet, manager_headers):
+    client = app.test_client()
+    client.post("/manager/topups/bulk_void", json={"tids": [1]}, headers=manager_headers)
+    body = client.post("/manager/topups/bulk_void", json={"tids": [1]}, headers=manager_headers).get_json()
+    assert body["voided"] == []
+    assert body["failed"] == [{"topup_id": 1, "error": "only succeeded top-ups can be voided"}]
+    db.session.expire_all()
+    assert db.session.get(WalletAccount, 7).balance_pesos == 70
@@ -0,0 +1,165 @@
+# backend/utils/reason_log.py
+"""
+Append-only JSONL log for top-up void reasons (audit convenience; the wallet
+ledger in the DB is the source of truth).
+
+Writers enqueue records; one background thread appends them in batches
+(up to BATCH_MAX records or BATCH_WAIT_S idle) and fdatasyncs once per batch
+instead of opening + closing a tiny file per void; anything still queued at
+interpreter exit is flushed by an atexit hook.
+The log lives in the app's instance folder (or REASON_LOG_DIR), never under
+static/, which the web server serves publicly.
+Readers keep an in-memory tid → reason index that is topped up incrementally
+from the file, so lookups never rescan the whole log.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+
+LOG_NAME = "topup_reasons.jsonl"
+
+BATCH_MAX = 50
+BATCH_WAIT_S = 0.2
+
+_q: "queue.Queue[tuple[str, dict]]" = queue.Queue()
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+_index: Dict[int, str] = {}
+_index_offset: Dict[str, int] = {}
+_index_lock = threading.Lock()
+
+
+def log_dir(app) -> str:
+    """Non-public directory for the log: REASON_LOG_DIR, else the app's instance folder."""
+    return app.config.get("REASON_LOG_DIR") or app.instance_path
+
+
+@lru_cache(maxsize=8)
+def log_path(dir_: str) -> str:
+    return os.path.join(dir_, LOG_NAME)
+
+
+def ensure_log_dir(app) -> str:
+    """Create the log's directory once at startup; returns the log path.
+
+    A log left at the old public location (static/) is moved over the first time.
+    """
+    path = log_path(log_dir(app))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    legacy = os.path.join(app.root_path, "static", LOG_NAME)
+    if os.path.exists(legacy) and not os.path.exists(path):
+        os.replace(legacy, path)
+    return path
+
+
+def _flush(path: str, records: list) -> None:
+    data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+        (getattr(os, "fdatasync", None) or os.fsync)(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_batch(batch: dict) -> None:
+    for p, recs in batch.items():
+        try:
+            _flush(p, recs)
+        except Exception:
+            # Best-effort audit trail: the DB ledger already recorded the void
+            pass
+
+
+def _run() -> None:
+    while True:
+        path, rec = _q.get()
+        batch = {path: [rec]}
+        deadline = time.monotonic() + BATCH_WAIT_S
+        n = 1
+        while n < BATCH_MAX:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                p, r = _q.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.setdefault(p, []).append(r)
+            n += 1
+        _write_batch(batch)
+        for _ in range(n):
+            _q.task_done()
+
+
+@atexit.register
+def _flush_at_exit(timeout_s: float = 2.0) -> None:
+    """Write out records still queued when the process exits (the writer is a daemon thread)."""
+    batch: dict = {}
+    n = 0
+    while True:
+        try:
+            p, r = _q.get_nowait()
+        except queue.Empty:
+            break
+        batch.setdefault(p, []).append(r)
+        n += 1
+    _write_batch(batch)
+    for _ in range(n):
+        _q.task_done()
+    # Let a batch the writer already took off the queue finish its write
+    deadline = time.monotonic() + timeout_s
+    with _q.all_tasks_done:
+        while _q.unfinished_tasks and time.monotonic() < deadline:
+            _q.all_tasks_done.wait(max(0.0, deadline - time.monotonic()))
+
+
+def _ensure_writer() -> None:
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run, name="reason-log", daemon=True)
+            _writer.start()
+
+
+def append_reason(dir_: str, tid: int, text: Optional[str]) -> None:
+    """Queue a reason for top-up `tid`; visible to lookup_reason() in this process immediately."""
+    if not (text and text.strip()):
+        return
+    reason = text.strip()
+    with _index_lock:
+        _index[int(tid)] = reason
+    _ensure_writer()
+    _q.put((log_path(dir_), {"tid": int(tid), "reason": reason, "at": int(time.time())}))
+
+
+def lookup_reason(dir_: str, tid: int) -> Optional[str]:
+    """Latest logged reason for top-up `tid`, or None."""
+    path = log_path(dir_)
+    with _index_lock:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        start = _index_offset.get(path, 0)
+        if size > start:
+            with open(path, "rb") as f:
+                f.seek(start)
+                chunk = f.read(size - start)
+            end = chunk.rfind(b"\n") + 1  # only whole lines; a batch may be mid-write
+            for line in chunk[:end].splitlines():
+                try:
+                    rec = json.loads(line)
+                    _index[int(rec["tid"])] = rec.get("reason") or ""
+                except Exception:
+                    continue
+            _index_offset[path] = start + end
+        return _index.get(int(tid)) or None
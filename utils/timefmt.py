@@ -0,0 +1,27 @@
+# utils/timefmt.py
+"""Shared time-of-day helpers for route responses (manager and commuter)."""
+from datetime import datetime, time
+from typing import Any, Optional
+
+
+def as_time(v: Any) -> Optional[time]:
+    """time / datetime / "HH:MM[:SS]" → naive time; None when it isn't a time."""
+    if v is None:
+        return None
+    if isinstance(v, datetime):
+        return v.time().replace(tzinfo=None)
+    if isinstance(v, time):
+        return v.replace(tzinfo=None)
+    if isinstance(v, str):
+        for fmt in ("%H:%M:%S", "%H:%M"):
+            try:
+                return datetime.strptime(v, fmt).time()
+            except ValueError:
+                pass
+    return None
+
+
+def fmt_hhmm(v: Any) -> str:
+    """as_time(v) as "HH:MM" ("" when it isn't a time); integer f-string, no strftime."""
+    tt = as_time(v)
+    return f"{tt.hour:02d}:{tt.minute:02d}" if tt else ""